@@ -0,0 +1,124 @@
+"""API HTTP locale de scoring (bibliothèque standard uniquement).
+
+Le modèle est chargé une seule fois au démarrage du processus puis partagé par
+tous les threads de requête.
+
+    python api.py --port 8000
+
+    POST /score    {"transactions": [{...}, ...]}  (ou directement une liste)
+    GET  /metrics  latences p50/p99 des requêtes de scoring
+    GET  /health
+"""
+import argparse
+import json
+import logging
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+from scoring import MODEL_PATH, load_model, score
+
+logger = logging.getLogger("fraude.api")
+
+# --- Suivi des Latences ---
+class LatencyTracker:
+    def __init__(self, window=10_000):
+        self._latencies_ms = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.rows = 0
+
+    def record(self, latency_ms, rows):
+        with self._lock:
+            self._latencies_ms.append(latency_ms)
+            self.requests += 1
+            self.rows += rows
+
+    def snapshot(self):
+        with self._lock:
+            latencies = np.array(self._latencies_ms, dtype=np.float64)
+            requests, rows = self.requests, self.rows
+        if latencies.size == 0:
+            return {"requests": requests, "rows": rows, "p50_ms": None, "p99_ms": None}
+        p50, p99 = np.percentile(latencies, [50, 99])
+        return {"requests": requests, "rows": rows, "p50_ms": round(float(p50), 3), "p99_ms": round(float(p99), 3)}
+
+# --- Gestionnaire de Requêtes ---
+PAYLOAD_ERROR = 'Corps attendu : {"transactions": [{...}, ...]} ou une liste de transactions (objets JSON)'
+
+def records_from_payload(payload):
+    records = payload.get("transactions", []) if isinstance(payload, dict) else payload
+    if not isinstance(records, list) or not all(isinstance(record, dict) for record in records):
+        raise ValueError(PAYLOAD_ERROR)
+    return records
+
+class ScoringHandler(BaseHTTPRequestHandler):
+    model = None
+    tracker = None
+
+    def _send_json(self, status, payload, extra_headers=None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (extra_headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send_json(200, {"status": "ok"})
+        elif self.path == "/metrics":
+            self._send_json(200, self.tracker.snapshot())
+        else:
+            self._send_json(404, {"error": "Route inconnue"})
+
+    def do_POST(self):
+        if self.path != "/score":
+            self._send_json(404, {"error": "Route inconnue"})
+            return
+        start = time.perf_counter()
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            payload = json.loads(self.rfile.read(length) or b"[]")
+            records = records_from_payload(payload)
+            results = score(records, self.model)
+        except (ValueError, TypeError, AttributeError) as e:
+            self._send_json(400, {"error": str(e)})
+            return
+        latency_ms = (time.perf_counter() - start) * 1000
+        self.tracker.record(latency_ms, len(results))
+        self._send_json(200, {"results": results, "latency_ms": round(latency_ms, 3)},
+                        {"X-Latency-Ms": f"{latency_ms:.3f}"})
+
+    def log_message(self, format, *args):
+        logger.info("%s - %s", self.address_string(), format % args)
+
+def create_server(host="127.0.0.1", port=8000, model_path=MODEL_PATH):
+    ScoringHandler.model = load_model(model_path)
+    ScoringHandler.tracker = LatencyTracker()
+    return ThreadingHTTPServer((host, port), ScoringHandler)
+
+def main():
+    parser = argparse.ArgumentParser(description="API HTTP locale de détection de fraude")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--model", default=MODEL_PATH)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s %(message)s")
+    server = create_server(args.host, args.port, args.model)
+    logger.info("API de scoring à l'écoute sur http://%s:%d", args.host, args.port)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
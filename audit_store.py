@@ -0,0 +1,256 @@
+"""Journal d'audit des prédictions (SQLite en mode WAL, écriture en arrière-plan).
+
+Chaque transaction scorée (formulaire ou analyse par lot) est enregistrée avec
+ses entrées, son vecteur encodé, sa probabilité, la version du modèle et le
+temps de traitement. record_* ne fait que déposer l'élément dans une file
+bornée : un thread unique les écrit par lots dans une seule transaction.
+Si la file est pleine, l'élément est compté comme perdu plutôt que de
+ralentir le scoring. Les index sur l'horodatage, la région et le résultat
+servent les graphiques « production » du Dashboard Analytique.
+
+    python audit_store.py stats
+    python audit_store.py export --since-hours 24 --out audit.csv
+"""
+import argparse
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import closing
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger("fraude.audit")
+
+AUDIT_DB_PATH = os.environ.get("FRAUDE_AUDIT_DB", "audit.sqlite")
+FLUSH_INTERVAL = 1.0  # Secondes maximum avant écriture d'un lot
+FLUSH_ROWS = 5_000
+QUEUE_SIZE = 10_000  # Éléments en attente (une prédiction ou un morceau de lot chacun)
+INPUT_COLUMNS = ["age", "salaire", "score_credit", "montant_transaction", "anciennete_compte",
+                 "type_carte", "region", "genre"]
+_STOP = object()
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS predictions (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    source TEXT NOT NULL,
+    model_version TEXT,
+    age REAL, salaire REAL, score_credit REAL, montant_transaction REAL, anciennete_compte REAL,
+    type_carte TEXT, region TEXT, genre TEXT,
+    encoded BLOB,
+    proba_fraude REAL NOT NULL,
+    prediction INTEGER NOT NULL,
+    latency_ms REAL,
+    cache_hit INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_predictions_ts ON predictions (ts);
+CREATE INDEX IF NOT EXISTS idx_predictions_region_ts ON predictions (region, ts);
+CREATE INDEX IF NOT EXISTS idx_predictions_prediction_ts ON predictions (prediction, ts);
+"""
+INSERT = (f"INSERT INTO predictions (ts, source, model_version, {', '.join(INPUT_COLUMNS)}, encoded, "
+          f"proba_fraude, prediction, latency_ms, cache_hit) VALUES ({', '.join(['?'] * (len(INPUT_COLUMNS) + 8))})")
+
+def connect(path=AUDIT_DB_PATH):
+    conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")  # Lecteurs (dashboard) jamais bloqués par l'écrivain
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+def _value(v):
+    # Types SQLite natifs ; NaN -> NULL
+    if v is None:
+        return None
+    if isinstance(v, (np.floating, float)):
+        return None if np.isnan(v) else float(v)
+    if isinstance(v, np.integer):
+        return int(v)
+    return v
+
+def _rows_from_frame(ts, source, model_version, df, X, proba, prediction, latency_ms, cache_hit):
+    columns = [df[c].to_numpy(dtype=object) if c in df.columns else [None] * len(df) for c in INPUT_COLUMNS]
+    encoded = np.ascontiguousarray(X, dtype=np.float64)
+    for i in range(len(df)):
+        yield (ts, source, model_version, *(_value(col[i]) for col in columns), encoded[i].tobytes(),
+               float(proba[i]), int(prediction[i]), latency_ms, cache_hit)
+
+class AuditStore:
+    def __init__(self, path=AUDIT_DB_PATH, flush_interval=FLUSH_INTERVAL, flush_rows=FLUSH_ROWS,
+                 queue_size=QUEUE_SIZE):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.flush_rows = flush_rows
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._lock = threading.Lock()
+        self.written = 0
+        self.dropped = 0
+        self.flushes = 0
+        self.errors = 0
+        connect(path).close()  # Schéma créé tout de suite : les lecteurs peuvent interroger la base vide
+        self._writer = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+        self._writer.start()
+
+    # --- Enregistrement (non bloquant) ---
+    def _put(self, item, rows):
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            with self._lock:
+                self.dropped += rows
+            logger.warning("File d'audit pleine : %d prédiction(s) non journalisée(s)", rows)
+
+    def record_prediction(self, inputs, encoded_vector, proba_fraude, prediction, model_version,
+                          latency_ms=None, cache_hit=None, source="formulaire"):
+        df = pd.DataFrame([inputs])
+        self._put((time.time(), source, model_version, df, np.reshape(encoded_vector, (1, -1)),
+                   [proba_fraude], [prediction], latency_ms, None if cache_hit is None else int(cache_hit)), 1)
+
+    def record_frame(self, scored_df, encoded, model_version, latency_ms=None, source="lot"):
+        # scored_df : sortie de scoring.score_frame (colonnes proba_fraude et prediction)
+        prediction = (scored_df["prediction"] == "Fraude").to_numpy(dtype=np.int64)
+        per_row_ms = None if latency_ms is None or not len(scored_df) else latency_ms / len(scored_df)
+        self._put((time.time(), source, model_version, scored_df, encoded, scored_df["proba_fraude"].to_numpy(),
+                   prediction, per_row_ms, None), len(scored_df))
+
+    # --- Écriture en arrière-plan ---
+    def _run(self):
+        conn = connect(self.path)
+        pending, pending_rows, stop = [], 0, False
+        deadline = None
+        while not stop:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+                if item is _STOP:
+                    stop = True
+                elif isinstance(item, threading.Event):
+                    self._write(conn, pending)
+                    pending, pending_rows, deadline = [], 0, None
+                    item.set()
+                    continue
+                else:
+                    pending.append(item)
+                    pending_rows += len(item[3])
+                    deadline = deadline or time.monotonic() + self.flush_interval
+            except queue.Empty:
+                pass
+            if pending and (stop or pending_rows >= self.flush_rows or time.monotonic() >= deadline):
+                self._write(conn, pending)
+                pending, pending_rows, deadline = [], 0, None
+        conn.close()
+
+    def _write(self, conn, items):
+        if not items:
+            return
+        rows = []
+        for item in items:
+            # Un lot mal formé est écarté seul : une exception ici arrêterait le thread d'écriture
+            try:
+                item_rows = list(_rows_from_frame(*item))
+            except Exception:
+                count = len(item[3])
+                logger.exception("Lot d'audit invalide : %d prédiction(s) non journalisée(s)", count)
+                with self._lock:
+                    self.errors += 1
+                    self.dropped += count
+                continue
+            rows.extend(item_rows)
+        if not rows:
+            return
+        try:
+            with conn:  # Une seule transaction par lot
+                conn.executemany(INSERT, rows)
+        except sqlite3.Error:
+            logger.exception("Échec d'écriture du journal d'audit (%d lignes)", len(rows))
+            with self._lock:
+                self.errors += 1
+                self.dropped += len(rows)
+            return
+        with self._lock:
+            self.written += len(rows)
+            self.flushes += 1
+
+    def flush(self, timeout=None):
+        # Attend que tout ce qui a été déposé avant l'appel soit écrit
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def close(self, timeout=None):
+        self._queue.put(_STOP)
+        self._writer.join(timeout)
+
+    def stats(self):
+        with self._lock:
+            return {"written": self.written, "dropped": self.dropped, "flushes": self.flushes,
+                    "errors": self.errors, "pending": self._queue.qsize()}
+
+# --- Requêtes (connexion en lecture séparée, index utilisés) ---
+def _read(path, sql, params=()):
+    if not os.path.exists(path):
+        return pd.DataFrame()
+    with closing(sqlite3.connect(path, timeout=30)) as conn:
+        return pd.read_sql_query(sql, conn, params=params)
+
+def production_summary(since_ts, path=AUDIT_DB_PATH, bucket_seconds=3600):
+    # Agrégats pour le dashboard : totaux, série temporelle par résultat, répartition par région
+    totals = _read(path, "SELECT COUNT(*) AS total, COALESCE(SUM(prediction), 0) AS fraud, AVG(latency_ms) AS latency_ms "
+                         "FROM predictions WHERE ts >= ?", (since_ts,))
+    timeline = _read(path, "SELECT CAST(ts / ? AS INTEGER) * ? AS bucket, prediction, COUNT(*) AS Count "
+                           "FROM predictions WHERE ts >= ? GROUP BY bucket, prediction ORDER BY bucket",
+                     (bucket_seconds, bucket_seconds, since_ts))
+    regions = _read(path, "SELECT region, prediction, COUNT(*) AS Count FROM predictions "
+                          "WHERE ts >= ? AND region IS NOT NULL GROUP BY region, prediction", (since_ts,))
+    for frame in (timeline, regions):
+        if not frame.empty:
+            frame["fraude"] = frame.pop("prediction").astype(str)
+    if not timeline.empty:
+        timeline["bucket"] = pd.to_datetime(timeline["bucket"], unit="s")
+    total = int(totals["total"].iloc[0]) if not totals.empty else 0
+    return {
+        "total": total,
+        "fraud": int(totals["fraud"].iloc[0]) if total else 0,
+        "latency_ms": None if not total or pd.isna(totals["latency_ms"].iloc[0]) else float(totals["latency_ms"].iloc[0]),
+        "timeline": timeline,
+        "regions": regions,
+    }
+
+def recent_predictions(path=AUDIT_DB_PATH, limit=50, frauds_only=False):
+    where = "WHERE prediction = 1" if frauds_only else ""
+    return _read(path, f"SELECT datetime(ts, 'unixepoch', 'localtime') AS horodatage, source, "
+                       f"{', '.join(INPUT_COLUMNS)}, proba_fraude, prediction, latency_ms, model_version "
+                       f"FROM predictions {where} ORDER BY ts DESC LIMIT ?", (limit,))
+
+def decode_vector(blob):
+    return np.frombuffer(blob, dtype=np.float64)
+
+def main():
+    parser = argparse.ArgumentParser(description="Journal d'audit des prédictions")
+    parser.add_argument("--db", default=AUDIT_DB_PATH)
+    sub = parser.add_subparsers(dest="command", required=True)
+    stats_parser = sub.add_parser("stats", help="Totaux et répartition par région")
+    stats_parser.add_argument("--since-hours", type=float, default=24.0)
+    export_parser = sub.add_parser("export", help="Exporte les prédictions récentes en CSV")
+    export_parser.add_argument("--since-hours", type=float, default=24.0)
+    export_parser.add_argument("--out", required=True)
+    args = parser.parse_args()
+
+    since_ts = time.time() - args.since_hours * 3600
+    if args.command == "stats":
+        summary = production_summary(since_ts, args.db)
+        print(f"{summary['total']} prédictions, {summary['fraud']} fraudes sur {args.since_hours:g} h")
+        if not summary["regions"].empty:
+            print(summary["regions"].pivot_table(index="region", columns="fraude", values="Count", fill_value=0))
+    else:
+        df = _read(args.db, "SELECT * FROM predictions WHERE ts >= ? ORDER BY ts", (since_ts,))
+        if "encoded" in df.columns:
+            df["encoded"] = df["encoded"].map(lambda b: decode_vector(b).tolist())
+        df.to_csv(args.out, index=False)
+        print(f"{len(df)} lignes écrites dans '{args.out}'")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,299 @@
+"""Suite de benchmarks des chemins critiques de l'application.
+
+Chaque cas est mesuré sur model.pkl et sur le dataset ré-échantillonné à
+plusieurs tailles : percentiles de latence, débit, pic mémoire (tracemalloc,
+sur une exécution séparée pour ne pas fausser les temps). Le résultat est
+écrit en JSON pour comparer deux commits.
+
+    python bench.py run --sizes 1000 100000 1000000 --out bench_abc123.json
+    python bench.py run --only batch_score --profile batch_score --profile-out batch.prof
+    python bench.py compare bench_avant.json bench_apres.json
+"""
+import argparse
+import cProfile
+import io
+import json
+import os
+import platform
+import pstats
+import subprocess
+import sys
+import time
+import tracemalloc
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from data_loading import CACHE_DIR, DATA_PATH, load_transaction_data, resolve_source, stream_dashboard_aggregates, write_synthetic_csv
+from scoring import MODEL_PATH, _load_model_uncached, encode_transactions, load_model, score_frame
+
+DEFAULT_SIZES = [1_000, 100_000, 1_000_000]
+DEFAULT_REPEAT = 20
+
+# --- Cas Mesurés ---
+# Chaque fabrique reçoit le contexte d'une taille et renvoie (fonction à mesurer, lignes traitées par appel)
+def _model_load_sklearn(ctx):
+    return (lambda: _load_model_uncached(ctx["model_path"], "sklearn")), None
+
+def _model_load_bundle(ctx):
+    import model_bundle
+    model_bundle.ensure_bundle(source_path=ctx["model_path"])
+    return (lambda: model_bundle.load_bundle()), None
+
+def _single_row(ctx):
+    row = ctx["sample"].iloc[[0]]
+    model = ctx["model"]
+    return (lambda: model.predict_proba(encode_transactions(row))), 1
+
+def _single_row_explain(ctx):
+    from explain import explanation_rows
+    X, model = encode_transactions(ctx["sample"].iloc[[0]]), ctx["model"]
+    return (lambda: explanation_rows(model, X)), 1
+
+def _drift_update(ctx):
+    from drift_monitor import DriftMonitor, load_baseline
+    df, monitor = ctx["frame"], DriftMonitor(load_baseline())
+    predictions = np.zeros(len(df), dtype=np.int64)
+    return (lambda: monitor.update(df, predictions)), len(df)
+
+def _batch_score(ctx):
+    df, model = ctx["frame"], ctx["model"]
+    return (lambda: score_frame(df, model)), len(df)
+
+def _load_csv(ctx):
+    return (lambda: load_transaction_data(ctx["path"], use_parquet_cache=False)), ctx["rows"]
+
+def _load_parquet(ctx):
+    resolve_source(ctx["path"])  # Conversion faite une fois, hors mesure
+    return (lambda: load_transaction_data(ctx["path"])), ctx["rows"]
+
+def _dashboard_aggregates(ctx):
+    return (lambda: stream_dashboard_aggregates(ctx["path"])), ctx["rows"]
+
+def _figure_case(builder_name):
+    def factory(ctx):
+        import dashboard_charts
+        builder, aggregates = getattr(dashboard_charts, builder_name), ctx["aggregates"]
+        return (lambda: builder(aggregates)), None
+    return factory
+
+def _pdf_report(ctx):
+    from reports import create_pdf_report
+    data = ctx["report_data"]
+    return (lambda: create_pdf_report(data)), None
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+APP_PAGES = {"home": "Accueil", "prediction": "Prédiction de Fraude", "dashboard": "Dashboard Analytique"}
+
+def _app_cold_start(ctx):
+    # Nouveau processus : imports + premier run de l'Accueil
+    code = (f"import warnings; warnings.filterwarnings('ignore'); from streamlit.testing.v1 import AppTest; "
+            f"AppTest.from_file({APP_PATH!r}, default_timeout=120).run()")
+    return (lambda: subprocess.run([sys.executable, "-c", code], check=True, capture_output=True,
+                                   cwd=os.path.dirname(APP_PATH))), None
+
+def _app_rerun(page):
+    def factory(ctx):
+        from streamlit.testing.v1 import AppTest
+        app = AppTest.from_file(APP_PATH, default_timeout=120).run()
+        if page != "Accueil":
+            app.selectbox(key="navigation_selectbox").set_value(page).run()
+        return app.run, None
+    return factory
+
+# Cas indépendants de la taille du fichier : mesurés une seule fois
+SIZE_INDEPENDENT = {"model_load_sklearn", "model_load_bundle", "single_row", "single_row_explain", "pdf_report", "app_cold_start",
+                    *(f"app_rerun_{name}" for name in APP_PAGES)}
+CASES = {
+    "model_load_sklearn": _model_load_sklearn,
+    "model_load_bundle": _model_load_bundle,
+    "single_row": _single_row,
+    "single_row_explain": _single_row_explain,
+    "batch_score": _batch_score,
+    "drift_update": _drift_update,
+    "load_csv": _load_csv,
+    "load_parquet": _load_parquet,
+    "dashboard_aggregates": _dashboard_aggregates,
+    **{f"figure_{name}": _figure_case(f"{name}_figure") for name in (
+        "amount_histogram", "amount_box", "region_fraud", "card_fraud_rate", "age_violin", "salary_credit_scatter")},
+    "pdf_report": _pdf_report,
+    "app_cold_start": _app_cold_start,
+    **{f"app_rerun_{name}": _app_rerun(page) for name, page in APP_PAGES.items()},
+}
+
+# --- Mesure ---
+def _repeat_for(rows, repeat):
+    # Moins de répétitions pour les gros fichiers, au moins 3
+    return max(3, repeat // max(1, (rows or 0) // 100_000))
+
+def measure(fn, repeat, rows=None):
+    fn()  # Échauffement (imports, caches)
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    p50, p95, p99 = np.percentile(samples, [50, 95, 99])
+    result = {
+        "runs": repeat,
+        "mean_ms": round(float(np.mean(samples)), 3),
+        "p50_ms": round(float(p50), 3),
+        "p95_ms": round(float(p95), 3),
+        "p99_ms": round(float(p99), 3),
+        "peak_mem_mb": round(peak / 2**20, 2),
+    }
+    if rows:
+        result["rows"] = rows
+        result["throughput_rows_s"] = round(rows / (p50 / 1000), 1)
+    return result
+
+def profile(fn, out_path=None, profiler="cprofile"):
+    fn()
+    if profiler == "pyinstrument":
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            raise SystemExit("pyinstrument n'est pas installé (pip install pyinstrument)")
+        prof = Profiler()
+        prof.start()
+        fn()
+        prof.stop()
+        if out_path:
+            with open(out_path, "w", encoding="utf-8") as f:
+                f.write(prof.output_html())
+        return prof.output_text(unicode=True)
+    prof = cProfile.Profile()
+    prof.runcall(fn)
+    if out_path:
+        prof.dump_stats(out_path)
+    buffer = io.StringIO()
+    pstats.Stats(prof, stream=buffer).sort_stats("cumulative").print_stats(25)
+    return buffer.getvalue()
+
+def _environment():
+    import sklearn
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "sklearn": sklearn.__version__,
+    }
+
+def _size_context(size, base_ctx, data_path):
+    path = data_path
+    if size:
+        path = os.path.join(CACHE_DIR, f"bench_synthetic_{size}.csv")
+        if not os.path.exists(path):
+            write_synthetic_csv(path, size, source=data_path)
+    frame = pd.read_csv(path)
+    return {**base_ctx, "path": path, "rows": len(frame), "frame": frame,
+            "aggregates": stream_dashboard_aggregates(path)}
+
+def run(sizes, repeat, only=None, model_path=MODEL_PATH, data_path=DATA_PATH, profile_case=None,
+        profile_out=None, profiler="cprofile"):
+    from reports import prediction_data_from_row
+
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    model = load_model(model_path)
+    sample = pd.read_csv(data_path)
+    scored = score_frame(sample.head(1), model)
+    base_ctx = {"model_path": model_path, "model": model, "sample": sample,
+                "report_data": prediction_data_from_row(scored.iloc[0])}
+    selected = [name for name in CASES if not only or name in only]
+    results, profiles = [], {}
+
+    def record(name, ctx, size):
+        fn, rows = CASES[name](ctx)
+        result = {"case": name, "size": size, **measure(fn, _repeat_for(rows, repeat), rows)}
+        results.append(result)
+        print(f"  {name:<32} {'-' if size is None else size:>9}  p50 {result['p50_ms']:10.2f} ms  "
+              f"p99 {result['p99_ms']:10.2f} ms  pic {result['peak_mem_mb']:8.1f} Mo", flush=True)
+        if name == profile_case and name not in profiles:
+            profiles[name] = profile(fn, profile_out, profiler)
+
+    for name in selected:
+        if name in SIZE_INDEPENDENT:
+            record(name, base_ctx, None)
+    for size in sizes:
+        ctx = _size_context(size, base_ctx, data_path)
+        for name in selected:
+            if name not in SIZE_INDEPENDENT:
+                record(name, ctx, ctx["rows"])
+    return {"environment": _environment(), "model_path": model_path, "data_path": data_path,
+            "results": results}, profiles
+
+# --- Comparaison entre Deux Exécutions ---
+def compare(before, after, threshold=0.10):
+    # Rapport p50 après/avant par (cas, taille) ; au-delà du seuil, signalé comme régression
+    index = {(r["case"], r["size"]): r for r in before["results"]}
+    lines, regressions = [], 0
+    for result in after["results"]:
+        old = index.get((result["case"], result["size"]))
+        if old is None or not old["p50_ms"]:
+            continue
+        ratio = result["p50_ms"] / old["p50_ms"]
+        flag = ""
+        if ratio > 1 + threshold:
+            flag, regressions = "  << régression", regressions + 1
+        elif ratio < 1 - threshold:
+            flag = "  amélioration"
+        size = "-" if result["size"] is None else result["size"]
+        lines.append(f"{result['case']:<32} {size:>9}  {old['p50_ms']:10.2f} -> {result['p50_ms']:10.2f} ms  x{ratio:.2f}{flag}")
+    return lines, regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks des chemins critiques (JSON + profil optionnel)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    run_parser = sub.add_parser("run", help="Mesure tous les cas (ou --only) et écrit un JSON")
+    run_parser.add_argument("--model", default=MODEL_PATH)
+    run_parser.add_argument("--data", default=DATA_PATH)
+    run_parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                            help="Tailles du dataset ré-échantillonné (0 = fichier d'origine)")
+    run_parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    run_parser.add_argument("--only", nargs="+", choices=list(CASES), default=None)
+    run_parser.add_argument("--out", default=None, help="Fichier JSON (défaut : bench_<commit>.json)")
+    run_parser.add_argument("--profile", choices=list(CASES), default=None, help="Profile ce cas (première taille)")
+    run_parser.add_argument("--profiler", choices=["cprofile", "pyinstrument"], default="cprofile")
+    run_parser.add_argument("--profile-out", default=None, help=".prof (cProfile) ou .html (pyinstrument)")
+    compare_parser = sub.add_parser("compare", help="Compare deux fichiers JSON de résultats")
+    compare_parser.add_argument("before")
+    compare_parser.add_argument("after")
+    compare_parser.add_argument("--threshold", type=float, default=0.10, help="Écart relatif signalé")
+    args = parser.parse_args()
+
+    if args.command == "compare":
+        with open(args.before, encoding="utf-8") as f:
+            before = json.load(f)
+        with open(args.after, encoding="utf-8") as f:
+            after = json.load(f)
+        lines, regressions = compare(before, after, args.threshold)
+        print("\n".join(lines))
+        print(f"{regressions} régression(s) au-delà de {args.threshold:.0%}")
+        raise SystemExit(1 if regressions else 0)
+
+    warnings.filterwarnings("ignore")
+    report, profiles = run(args.sizes, args.repeat, args.only, args.model, args.data,
+                           args.profile, args.profile_out, args.profiler)
+    out_path = args.out or f"bench_{report['environment']['commit'] or 'local'}.json"
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"Résultats écrits dans '{out_path}'")
+    for name, text in profiles.items():
+        print(f"\n--- Profil : {name} ---\n{text}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+"""Variantes compactes de la forêt : taille et latence face à la qualité.
+
+À partir de la forêt de model.pkl (convertie en FlatForest), construit :
+- une sélection gloutonne d'arbres (ajout, un par un, de l'arbre qui réduit
+  le plus le score de Brier de l'ensemble sur un jeu de sélection),
+- des arbres coupés en profondeur,
+- des seuils/valeurs en float32 (seuils arrondis vers le bas : mêmes feuilles),
+- un mode d'arrêt anticipé qui évalue les arbres par paquets et s'arrête dès
+  que le vote est acquis (exact) ou assez tranché (marge).
+
+Le jeu réservé est la partie test du découpage de train.py (SMOTE, session 123),
+réencodée avec le prétraitement du modèle puis coupée en deux : sélection des
+arbres / évaluation. Pour un modèle produit par train.py ces lignes n'ont
+jamais servi à l'entraînement ; pour le model.pkl du notebook, le découpage
+suit le même protocole sans garantie d'être identique.
+
+    python compaction.py report                         # tableau qualité / taille / latence
+    python compaction.py report --json compaction.json
+    python compaction.py export --variant select25_f32  # remplace model_bundle/ (backend "auto")
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+
+from forest_engine import FlatForest
+
+SELECTION_SIZES = (50, 25, 10)
+DEPTH_LIMITS = (12, 8)
+EARLY_EXIT_CHUNK = 10  # Arbres évalués entre deux vérifications du vote
+EARLY_EXIT_MARGIN = 0.3  # Arrêt si |proba partielle - 0.5| >= marge
+BATCH_ROWS = 10_000
+CLASS_INDEX = 1
+
+# --- Sélection Gloutonne d'Arbres ---
+def tree_probas(forest, X, class_index=CLASS_INDEX):
+    # Probabilité de la classe donnée par chaque arbre : (n_lignes, n_arbres)
+    return forest.value[forest.apply(X), class_index]
+
+def greedy_selection(tree_proba, y, n_trees=None):
+    # Ordre d'ajout des arbres (sans remise) minimisant à chaque pas le score de Brier de la moyenne
+    n_trees = n_trees or tree_proba.shape[1]
+    y = np.asarray(y, dtype=np.float64)[:, None]
+    running = np.zeros(tree_proba.shape[0])
+    available = np.ones(tree_proba.shape[1], dtype=bool)
+    order = []
+    for k in range(n_trees):
+        brier = (((running[:, None] + tree_proba) / (k + 1) - y) ** 2).mean(axis=0)
+        brier[~available] = np.inf
+        best = int(np.argmin(brier))
+        order.append(best)
+        available[best] = False
+        running += tree_proba[:, best]
+    return order
+
+# --- Arrêt Anticipé ---
+class EarlyExitForest:
+    # Évalue les arbres par paquets ; une ligne s'arrête dès que son vote est décidé.
+    # margin=None : arrêt seulement si les arbres restants ne peuvent plus changer la classe (prédictions identiques)
+    def __init__(self, forest, chunk=EARLY_EXIT_CHUNK, margin=None):
+        self.forest = forest
+        self.margin = margin
+        self.chunks = [forest.select_trees(range(start, min(start + chunk, forest.n_estimators)))
+                       for start in range(0, forest.n_estimators, chunk)]
+        self.classes_ = forest.classes_
+        self.n_features_in_ = forest.n_features_in_
+        self.feature_names_in_ = forest.feature_names_in_
+        self.nbytes = forest.nbytes
+        self.n_estimators = forest.n_estimators
+        self.mean_trees = None  # Arbres évalués par ligne (moyenne, dernier appel)
+
+    def predict_proba(self, X):
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        total = self.forest.n_estimators
+        votes = np.zeros(X.shape[0])
+        seen = np.zeros(X.shape[0], dtype=np.int64)
+        active = np.arange(X.shape[0])
+        for chunk in self.chunks:
+            votes[active] += chunk.value[chunk.apply(X[active]), CLASS_INDEX].sum(axis=1)
+            seen[active] += chunk.n_estimators
+            partial, done_trees = votes[active], seen[active]
+            if self.margin is None:
+                # Classe acquise : au-dessus de 0.5 même si les arbres restants votent 0, ou en dessous même s'ils votent 1
+                decided = (partial > total / 2) | (partial + (total - done_trees) <= total / 2)
+            else:
+                decided = np.abs(partial / done_trees - 0.5) >= self.margin
+            active = active[~decided]
+            if active.size == 0:
+                break
+        self.mean_trees = float(seen.mean()) if seen.size else 0.0
+        proba = votes / np.maximum(seen, 1)
+        return np.column_stack([1.0 - proba, proba])
+
+    def predict(self, X):
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+# --- Variantes ---
+def build_variants(forest, X_select, y_select):
+    order = greedy_selection(tree_probas(forest, X_select), y_select)
+    variants = {
+        "full": ("Forêt complète", forest),
+        "float32": ("Float32", forest.to_float32()),
+    }
+    for depth in DEPTH_LIMITS:
+        variants[f"depth{depth}"] = (f"Profondeur ≤ {depth}", forest.truncate(depth))
+    for size in SELECTION_SIZES:
+        variants[f"select{size}"] = (f"Sélection {size} arbres", forest.select_trees(order[:size]))
+    variants["select25_f32"] = ("Sélection 25 + float32", forest.select_trees(order[:25]).to_float32())
+    variants["select25_depth12_f32"] = ("Sélection 25 + profondeur ≤ 12 + float32",
+                                        forest.select_trees(order[:25]).truncate(12).to_float32())
+    ordered = forest.select_trees(order)
+    variants["early_exit"] = ("Arrêt anticipé (exact)", EarlyExitForest(ordered))
+    variants["early_exit_margin"] = (f"Arrêt anticipé (marge {EARLY_EXIT_MARGIN})",
+                                     EarlyExitForest(ordered, margin=EARLY_EXIT_MARGIN))
+    return variants
+
+def _latencies_ms(fn, repeat):
+    samples = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        fn(i)
+        samples.append((time.perf_counter() - start) * 1000)
+    return np.asarray(samples)
+
+def evaluate_variant(model, X, y, reference_proba, repeat=200):
+    proba = model.predict_proba(X)[:, CLASS_INDEX]
+    prediction = (proba > 0.5).astype(np.int64)
+    positives = y == 1
+    row = {
+        "trees": int(model.n_estimators),
+        "size_mb": model.nbytes / 1e6,
+        "accuracy": float((prediction == y).mean()),
+        "recall": float(prediction[positives].mean()) if positives.any() else None,
+        "agreement": float((prediction == (reference_proba > 0.5)).mean()),
+        "max_proba_diff": float(np.abs(proba - reference_proba).max()),
+    }
+    if isinstance(model, EarlyExitForest):
+        row["mean_trees"] = model.mean_trees
+    single = _latencies_ms(lambda i: model.predict_proba(X[i % len(X):i % len(X) + 1]), repeat)
+    batch = X[np.arange(BATCH_ROWS) % len(X)]
+    batch_ms = float(np.median(_latencies_ms(lambda i: model.predict_proba(batch), max(3, repeat // 50))))
+    row.update(single_p50_ms=float(np.median(single)), single_p99_ms=float(np.percentile(single, 99)),
+               batch_rows_per_s=BATCH_ROWS / batch_ms * 1000)
+    return row
+
+def load_holdout(preprocessor, data_path, use_cache=True):
+    # Test de train.py réencodé avec le prétraitement du modèle, coupé en sélection / évaluation
+    from sklearn.model_selection import train_test_split
+    from train import SESSION_ID, prepare
+
+    split, _, _ = prepare(data_path, use_cache=use_cache)
+    X = preprocessor.scale(preprocessor.clip(split["X_test_encoded"]))
+    return train_test_split(X, split["y_test"], train_size=0.5, stratify=split["y_test"], random_state=SESSION_ID)
+
+def compaction_report(forest, X_select, X_eval, y_select, y_eval, repeat=200):
+    variants = build_variants(forest, X_select, y_select)
+    reference_proba = forest.predict_proba(X_eval)[:, CLASS_INDEX]
+    return [{"variant": name, "label": label, **evaluate_variant(model, X_eval, y_eval, reference_proba, repeat)}
+            for name, (label, model) in variants.items()]
+
+def main():
+    from scoring import MODEL_PATH, PREPROCESSOR_PATH, load_model, load_preprocessor
+    from train import DATA_PATH
+
+    parser = argparse.ArgumentParser(description="Variantes compactes de la forêt (taille, latence, qualité)")
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--preprocessor", default=PREPROCESSOR_PATH, help="Prétraitement du modèle (pour réencoder le jeu réservé)")
+    parser.add_argument("--data", default=DATA_PATH, help="CSV d'origine du découpage de train.py")
+    parser.add_argument("--no-cache", action="store_true")
+    sub = parser.add_subparsers(dest="command", required=True)
+    report_parser = sub.add_parser("report", help="Tableau qualité / taille / latence de chaque variante")
+    report_parser.add_argument("--repeat", type=int, default=200, help="Mesures de latence unitaire par variante")
+    report_parser.add_argument("--json", default=None, help="Écrit aussi le tableau en JSON")
+    export_parser = sub.add_parser("export", help="Exporte une variante au format bundle mmap")
+    export_parser.add_argument("--variant", required=True)
+    export_parser.add_argument("--out", default=None, help="Dossier du bundle (défaut : model_bundle/)")
+    args = parser.parse_args()
+
+    forest = FlatForest.from_sklearn(load_model(args.model, backend="sklearn"))
+    X_select, X_eval, y_select, y_eval = load_holdout(load_preprocessor(args.preprocessor), args.data, use_cache=not args.no_cache)
+    print(f"Jeu réservé : {len(y_select)} lignes de sélection, {len(y_eval)} lignes d'évaluation")
+
+    if args.command == "export":
+        from model_bundle import BUNDLE_PATH, export_bundle
+        variants = build_variants(forest, X_select, y_select)
+        if args.variant not in variants:
+            parser.error(f"Variante inconnue '{args.variant}' (choix : {', '.join(variants)})")
+        label, model = variants[args.variant]
+        if not isinstance(model, FlatForest):
+            parser.error("L'arrêt anticipé est un mode d'évaluation, pas un format : exportez la variante de base")
+        out = args.out or BUNDLE_PATH
+        # Source = model.pkl : le backend "auto" de scoring charge la variante à la place de la forêt complète,
+        # et scoring.model_version() porte son nom (clés de cache, audit, rapports)
+        export_bundle(model, out, args.model, variant=args.variant)
+        print(f"Variante « {label} » exportée dans '{out}' ({model.n_estimators} arbres, {model.nbytes / 1e6:.2f} Mo)")
+        return
+
+    rows = compaction_report(forest, X_select, X_eval, y_select, y_eval, args.repeat)
+    print(f"{'variante':<24} {'arbres':>6} {'Mo':>6} {'accuracy':>9} {'recall':>7} {'accord':>7} {'Δproba max':>10} "
+          f"{'1 ligne p50':>12} {'p99':>9} {'lot (l/s)':>10}")
+    for row in rows:
+        trees = f"{row['mean_trees']:.1f}" if "mean_trees" in row else str(row["trees"])
+        print(f"{row['variant']:<24} {trees:>6} {row['size_mb']:6.2f} {row['accuracy']:9.4f} {row['recall']:7.4f} "
+              f"{row['agreement']:7.2%} {row['max_proba_diff']:10.4f} {row['single_p50_ms']:9.3f} ms "
+              f"{row['single_p99_ms']:6.3f} ms {row['batch_rows_per_s']:10.0f}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"model": args.model, "selection_rows": len(y_select), "evaluation_rows": len(y_eval),
+                       "variants": rows}, f, indent=2, ensure_ascii=False)
+        print(f"Tableau écrit dans '{args.json}'")
+
+if __name__ == "__main__":
+    main()
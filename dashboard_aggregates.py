@@ -0,0 +1,174 @@
+"""Agrégats du « Dashboard Analytique », calculés en une passe.
+
+Le tableau de bord n'affiche plus les graphiques à partir du DataFrame complet :
+DashboardAccumulator parcourt les données une fois (un DataFrame entier ou des
+morceaux successifs) et ne conserve que des compteurs, des histogrammes à
+bornes fixes, des résumés de quantiles et un échantillon stratifié par statut
+de fraude, de taille bornée. Le coût d'affichage ne dépend donc plus du nombre
+de lignes.
+"""
+import hashlib
+import os
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+FRAUD_COLUMN_CANDIDATES = ['IsFraud', 'fraude', 'Fraude', 'Target', 'is_fraud']
+HISTOGRAM_COLUMNS = ["montant_transaction"]
+BOX_COLUMN = "montant_transaction"
+SAMPLE_COLUMNS = ["age", "salaire", "score_credit", "montant_transaction", "region"]
+N_BINS = 50
+QUANTILE_BINS = 2048  # Résolution des histogrammes fins servant aux quantiles
+SAMPLE_PER_LABEL = 2000  # Points par statut de fraude pour le violon et le nuage de points
+FRAUD_LABELS = ('0', '1')
+
+def detect_fraud_column(columns):
+    for col in FRAUD_COLUMN_CANDIDATES:
+        if col in columns:
+            return col
+    return None
+
+def normalize_fraud_labels(series):
+    # 0/1, 0.0/1.0, "0"/"1", booléens -> '0'/'1' ; le reste (NaN compris) -> None
+    numeric = pd.to_numeric(series, errors="coerce")
+    return pd.Series(np.select([numeric == 1, numeric == 0], ['1', '0'], default=None),
+                     index=series.index, dtype=object)
+
+@lru_cache(maxsize=32)
+def _hash_file(path, size, mtime_ns):
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 22), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def file_content_hash(path):
+    # Le contenu n'est relu que si la taille ou la date de modification changent
+    stat = os.stat(path)
+    return _hash_file(os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+
+def _quantiles_from_histogram(counts, edges, probs):
+    cumulative = np.concatenate([[0], np.cumsum(counts)])
+    total = cumulative[-1]
+    if total == 0:
+        return [None] * len(probs)
+    return [float(np.interp(p * total, cumulative, edges)) for p in probs]
+
+class DashboardAccumulator:
+    def __init__(self, fraud_column, histogram_ranges, n_bins=N_BINS,
+                 sample_per_label=SAMPLE_PER_LABEL, seed=0):
+        self.fraud_column = fraud_column
+        self.columns = None
+        self.preview = None
+        self.total = 0
+        self.label_counts = {label: 0 for label in FRAUD_LABELS}
+        self.histograms = {col: {"edges": np.linspace(lo, hi, n_bins + 1), "counts": np.zeros(n_bins, np.int64)}
+                           for col, (lo, hi) in histogram_ranges.items()}
+        self.box = {}
+        if BOX_COLUMN in histogram_ranges:
+            lo, hi = histogram_ranges[BOX_COLUMN]
+            self.box = {label: {"edges": np.linspace(lo, hi, QUANTILE_BINS + 1),
+                                "counts": np.zeros(QUANTILE_BINS, np.int64),
+                                "min": np.inf, "max": -np.inf} for label in FRAUD_LABELS}
+        self.region_counts = {}
+        self.card_counts = {}
+        self.sample_per_label = sample_per_label
+        self.sample = None
+        self._rng = np.random.default_rng(seed)
+
+    def _update_sample(self, chunk, labels):
+        columns = [c for c in SAMPLE_COLUMNS if c in chunk.columns]
+        candidates = chunk.loc[labels.notna(), columns].copy()
+        candidates["_label"] = labels[labels.notna()].to_numpy()
+        # Clé aléatoire par ligne : garder les k plus petites par statut = échantillon uniforme, fusionnable
+        candidates["_key"] = self._rng.random(len(candidates))
+        merged = candidates if self.sample is None else pd.concat([self.sample, candidates], ignore_index=True)
+        self.sample = (merged.sort_values("_key")
+                             .groupby("_label", sort=False, group_keys=False)
+                             .head(self.sample_per_label)
+                             .reset_index(drop=True))
+
+    def update(self, chunk):
+        if self.columns is None:
+            self.columns = list(chunk.columns)
+            self.preview = chunk.head()
+        self.total += len(chunk)
+        labels = normalize_fraud_labels(chunk[self.fraud_column]) if self.fraud_column else None
+
+        for col, hist in self.histograms.items():
+            values = pd.to_numeric(chunk[col], errors="coerce").to_numpy(np.float64)
+            values = np.clip(values[~np.isnan(values)], hist["edges"][0], hist["edges"][-1])
+            hist["counts"] += np.histogram(values, bins=hist["edges"])[0]
+
+        if labels is None:
+            return self
+        for label in FRAUD_LABELS:
+            self.label_counts[label] += int((labels == label).sum())
+        if self.box:
+            values = pd.to_numeric(chunk[BOX_COLUMN], errors="coerce")
+            for label, stats in self.box.items():
+                selected = values[(labels == label) & values.notna()].to_numpy(np.float64)
+                if selected.size:
+                    stats["min"] = min(stats["min"], float(selected.min()))
+                    stats["max"] = max(stats["max"], float(selected.max()))
+                    clipped = np.clip(selected, stats["edges"][0], stats["edges"][-1])
+                    stats["counts"] += np.histogram(clipped, bins=stats["edges"])[0]
+        if "region" in chunk.columns:
+            self._add_pairs(self.region_counts, chunk["region"], labels)
+        if "type_carte" in chunk.columns:
+            self._add_pairs(self.card_counts, chunk["type_carte"], labels)
+        self._update_sample(chunk, labels)
+        return self
+
+    @staticmethod
+    def _add_pairs(store, categories, labels):
+        # Libellés en chaînes : les morceaux "category" n'ont pas tous les mêmes modalités
+        counts = pd.DataFrame({"cat": categories.astype(object), "label": labels}).dropna().value_counts()
+        for (category, label), count in counts.items():
+            store[(category, label)] = store.get((category, label), 0) + int(count)
+
+    def result(self):
+        fraud = self.label_counts['1']
+        result = {
+            "fraud_column": self.fraud_column,
+            "columns": self.columns or [],
+            "preview": self.preview,
+            "total": self.total,
+            "fraud": fraud,
+            "non_fraud": self.total - fraud,
+            "histograms": {col: {"edges": h["edges"], "counts": h["counts"].copy()} for col, h in self.histograms.items()},
+            "box": {},
+            "region_counts": pd.DataFrame([(r, l, c) for (r, l), c in sorted(self.region_counts.items())],
+                                          columns=["region", "fraude", "Count"]),
+            "card_rates": None,
+            "sample": None if self.sample is None else self.sample.drop(columns="_key").rename(columns={"_label": "fraude"}),
+        }
+        for label, stats in self.box.items():
+            if stats["counts"].sum() == 0:
+                continue
+            q1, median, q3 = _quantiles_from_histogram(stats["counts"], stats["edges"], [0.25, 0.5, 0.75])
+            iqr = q3 - q1
+            result["box"][label] = {
+                "q1": q1, "median": median, "q3": q3,
+                "lowerfence": max(stats["min"], q1 - 1.5 * iqr),
+                "upperfence": min(stats["max"], q3 + 1.5 * iqr),
+            }
+        if self.card_counts:
+            cards = pd.DataFrame([(t, l, c) for (t, l), c in self.card_counts.items()],
+                                 columns=["type_carte", "fraude", "Count"])
+            table = cards.pivot_table(index="type_carte", columns="fraude", values="Count", aggfunc="sum", fill_value=0)
+            if '1' in table.columns:
+                rates = table['1'] / table.sum(axis=1) * 100
+                result["card_rates"] = rates.rename("Fraud_Rate").reset_index()
+        return result
+
+def compute_aggregates(df, fraud_column=None):
+    fraud_column = fraud_column or detect_fraud_column(df.columns)
+    ranges = {}
+    for col in HISTOGRAM_COLUMNS:
+        if col in df.columns:
+            values = pd.to_numeric(df[col], errors="coerce")
+            if values.notna().any():
+                ranges[col] = (float(values.min()), float(values.max()))
+    return DashboardAccumulator(fraud_column, ranges).update(df).result()
@@ -0,0 +1,77 @@
+"""Figures Plotly du « Dashboard Analytique », construites à partir des agrégats.
+
+Chaque fonction reçoit le dictionnaire produit par
+dashboard_aggregates.DashboardAccumulator.result() : histogrammes déjà
+binnés, quantiles déjà calculés, échantillon déjà limité.
+"""
+import plotly.express as px
+import plotly.graph_objects as go
+
+FRAUD_COLORS = {'0': '#4CAF50', '1': '#F44336'}
+
+def amount_histogram_figure(aggregates):
+    hist = aggregates["histograms"]["montant_transaction"]
+    edges = hist["edges"]
+    fig = go.Figure(go.Bar(x=(edges[:-1] + edges[1:]) / 2, y=hist["counts"], width=edges[1:] - edges[:-1],
+                           marker_color='#4CAF50', name="montant_transaction"))
+    fig.update_layout(title="Distribution des Montants de Transaction", bargap=0,
+                      xaxis_title="montant_transaction", yaxis_title="count")
+    return fig
+
+def amount_box_figure(aggregates):
+    fig = go.Figure()
+    for label, stats in sorted(aggregates["box"].items()):
+        fig.add_trace(go.Box(x=[label], name=label, marker_color=FRAUD_COLORS.get(label),
+                             q1=[stats["q1"]], median=[stats["median"]], q3=[stats["q3"]],
+                             lowerfence=[stats["lowerfence"]], upperfence=[stats["upperfence"]]))
+    fig.update_layout(title="Montant de Transaction par Type de Fraude",
+                      xaxis_title=aggregates["fraud_column"], yaxis_title="montant_transaction")
+    return fig
+
+def region_fraud_figure(aggregates):
+    return px.bar(aggregates["region_counts"], x="region", y="Count", color="fraude",
+                  title="Nombre de Transactions par Région et Statut de Fraude",
+                  color_discrete_map=FRAUD_COLORS)
+
+def card_fraud_rate_figure(aggregates):
+    return px.bar(aggregates["card_rates"], x="type_carte", y="Fraud_Rate",
+                  title="Taux de Fraude par Type de Carte",
+                  color_discrete_sequence=['#F44336'])
+
+def age_violin_figure(aggregates):
+    # Échantillon stratifié : la forme de chaque violon reste fidèle, le nombre de points est borné
+    return px.violin(aggregates["sample"], y="age", x="fraude", box=True, points="all",
+                     title="Distribution de l'Âge par Statut de Fraude",
+                     color="fraude", color_discrete_map=FRAUD_COLORS,
+                     labels={"fraude": aggregates["fraud_column"]})
+
+def salary_credit_scatter_figure(aggregates):
+    sample = aggregates["sample"]
+    hover = [c for c in ("age", "region", "montant_transaction") if c in sample.columns]
+    return px.scatter(sample, x="salaire", y="score_credit", color="fraude",
+                      title="Salaire vs Score de Crédit par Statut de Fraude",
+                      color_discrete_map=FRAUD_COLORS, hover_data=hover,
+                      labels={"fraude": aggregates["fraud_column"]})
+
+# --- Prédictions en Production (journal d'audit) ---
+def production_timeline_figure(summary):
+    return px.bar(summary["timeline"], x="bucket", y="Count", color="fraude",
+                  title="Prédictions en Production par Période",
+                  color_discrete_map=FRAUD_COLORS, labels={"bucket": "Période", "fraude": "Fraude"})
+
+def production_region_figure(summary):
+    return px.bar(summary["regions"], x="region", y="Count", color="fraude",
+                  title="Prédictions en Production par Région",
+                  color_discrete_map=FRAUD_COLORS, labels={"fraude": "Fraude"})
+
+# --- Dérive des Données (référence d'entraînement vs production) ---
+def drift_distribution_figure(feature_report):
+    # Parts par case d'histogramme (ou par modalité) : entraînement vs production
+    expected = feature_report["expected"]
+    actual = feature_report["actual"]
+    fig = go.Figure()
+    fig.add_bar(x=feature_report["bins"], y=[v / (sum(expected) or 1) for v in expected], name="Entraînement")
+    fig.add_bar(x=feature_report["bins"], y=[v / (sum(actual) or 1) for v in actual], name="Production")
+    fig.update_layout(barmode="group", title=f"Distribution de '{feature_report['feature']}' : Entraînement vs Production",
+                      yaxis_tickformat=".0%", xaxis_title=None, yaxis_title="Part des transactions")
+    return fig
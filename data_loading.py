@@ -0,0 +1,190 @@
+"""Chargement des transactions par morceaux, en types compacts.
+
+Les extraits de transactions peuvent dépasser la mémoire disponible : on les lit
+par morceaux avec des types explicites (float32 pour les numériques, category
+pour les libellés), on peut les convertir une fois en cache Parquet
+(lu ensuite en mémoire projetée) et les statistiques du dashboard sont
+calculées morceau par morceau.
+
+    python data_loading.py bench --rows 10000000   # temps et pic de RSS
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+import pandas as pd
+
+from dashboard_aggregates import HISTOGRAM_COLUMNS, DashboardAccumulator, detect_fraud_column
+
+DATA_PATH = "fraude_bancaire_synthetique_final.csv"
+CACHE_DIR = ".cache"
+CHUNK_SIZE = 250_000
+NUMERIC_COLUMNS = ["age", "salaire", "score_credit", "montant_transaction", "anciennete_compte", "fraude"]
+CATEGORY_COLUMNS = ["type_carte", "region", "genre"]
+DTYPES = {**{col: "float32" for col in NUMERIC_COLUMNS}, **{col: "category" for col in CATEGORY_COLUMNS}}
+
+def _is_parquet(path):
+    return str(path).lower().endswith(".parquet")
+
+def _compact(df):
+    # Types compacts aussi pour les morceaux Parquet écrits par un autre outil
+    for col in df.columns:
+        if col in DTYPES and str(df[col].dtype) != DTYPES[col]:
+            df[col] = df[col].astype(DTYPES[col])
+    return df
+
+# --- Lecture par Morceaux ---
+def iter_transaction_chunks(path=DATA_PATH, chunk_size=CHUNK_SIZE):
+    if _is_parquet(path):
+        import pyarrow.parquet as pq
+        parquet_file = pq.ParquetFile(path, memory_map=True,
+                                      read_dictionary=[c for c in CATEGORY_COLUMNS if c in pq.read_schema(path).names])
+        for record_batch in parquet_file.iter_batches(batch_size=chunk_size):
+            yield _compact(record_batch.to_pandas())
+    else:
+        yield from pd.read_csv(path, chunksize=chunk_size, dtype=DTYPES)
+
+# --- Cache Parquet ---
+def parquet_cache_path(csv_path, cache_dir=CACHE_DIR):
+    stat = os.stat(csv_path)
+    stem = os.path.splitext(os.path.basename(csv_path))[0]
+    return os.path.join(cache_dir, f"{stem}-{stat.st_size}-{stat.st_mtime_ns}.parquet")
+
+def convert_to_parquet(csv_path, parquet_path, chunk_size=CHUNK_SIZE):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    os.makedirs(os.path.dirname(parquet_path) or ".", exist_ok=True)
+    tmp_path = parquet_path + ".tmp"
+    writer = None
+    try:
+        for chunk in pd.read_csv(csv_path, chunksize=chunk_size, dtype=DTYPES):
+            # Les catégories varient d'un morceau à l'autre : on écrit des chaînes, encodées en dictionnaire par Parquet
+            for col in CATEGORY_COLUMNS:
+                if col in chunk.columns:
+                    chunk[col] = chunk[col].astype(object)
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(tmp_path, table.schema, use_dictionary=True)
+            writer.write_table(table.cast(writer.schema))
+    finally:
+        if writer is not None:
+            writer.close()
+    os.replace(tmp_path, parquet_path)
+    return parquet_path
+
+def resolve_source(path=DATA_PATH, use_parquet_cache=True):
+    # CSV -> cache Parquet (créé au premier appel) ; Parquet et cache désactivé -> tel quel
+    if not use_parquet_cache or _is_parquet(path):
+        return path
+    cache_path = parquet_cache_path(path)
+    if not os.path.exists(cache_path):
+        convert_to_parquet(path, cache_path)
+    return cache_path
+
+def load_transaction_data(path=DATA_PATH, use_parquet_cache=True):
+    source = resolve_source(path, use_parquet_cache)
+    if _is_parquet(source):
+        import pyarrow.parquet as pq
+        names = pq.ParquetFile(source).schema_arrow.names
+        # Libellés lus directement en dictionnaire (-> category) ; les buffers Arrow sont libérés pendant la conversion
+        table = pq.read_table(source, memory_map=True, read_dictionary=[c for c in CATEGORY_COLUMNS if c in names])
+        return _compact(table.to_pandas(split_blocks=True, self_destruct=True))
+    chunks = list(iter_transaction_chunks(source))
+    if not chunks:
+        return pd.DataFrame(columns=list(DTYPES))
+    # Catégories différentes selon les morceaux : concat les repasse en object, on les recompacte
+    return _compact(pd.concat(chunks, ignore_index=True))
+
+# --- Statistiques Incrémentales du Dashboard ---
+def _histogram_ranges(source, chunk_size):
+    ranges = {}
+    if _is_parquet(source):
+        # Min/max lus dans les statistiques des row groups : aucune donnée à parcourir
+        import pyarrow.parquet as pq
+        metadata = pq.ParquetFile(source).metadata
+        names = metadata.schema.names
+        for col in HISTOGRAM_COLUMNS:
+            if col not in names:
+                continue
+            index = names.index(col)
+            stats = [metadata.row_group(i).column(index).statistics for i in range(metadata.num_row_groups)]
+            if stats and all(s is not None and s.has_min_max for s in stats):
+                ranges[col] = (float(min(s.min for s in stats)), float(max(s.max for s in stats)))
+        if len(ranges) == len([c for c in HISTOGRAM_COLUMNS if c in names]):
+            return ranges
+    for chunk in iter_transaction_chunks(source, chunk_size):
+        for col in HISTOGRAM_COLUMNS:
+            if col in chunk.columns and chunk[col].notna().any():
+                lo, hi = float(chunk[col].min()), float(chunk[col].max())
+                old = ranges.get(col, (lo, hi))
+                ranges[col] = (min(old[0], lo), max(old[1], hi))
+    return ranges
+
+def stream_dashboard_aggregates(path=DATA_PATH, use_parquet_cache=True, chunk_size=CHUNK_SIZE):
+    source = resolve_source(path, use_parquet_cache)
+    accumulator = None
+    for chunk in iter_transaction_chunks(source, chunk_size):
+        if accumulator is None:
+            accumulator = DashboardAccumulator(detect_fraud_column(chunk.columns),
+                                               _histogram_ranges(source, chunk_size))
+        accumulator.update(chunk)
+    if accumulator is None:
+        raise ValueError(f"Le fichier '{path}' ne contient aucune transaction")
+    return accumulator.result()
+
+# --- Benchmark ---
+def write_synthetic_csv(path, rows, seed=0, source=DATA_PATH, chunk_size=CHUNK_SIZE):
+    # Transactions générées selon le profil du dataset (synthetic.py), écrites par morceaux (mémoire bornée)
+    from synthetic import write_synthetic
+    return write_synthetic(path, rows, seed, source, chunk_size)
+
+_BENCH_CASES = {
+    "read_csv": "import pandas as pd; pd.read_csv({path!r})",
+    "chunked_compact": "from data_loading import load_transaction_data; load_transaction_data({path!r}, use_parquet_cache=False)",
+    "parquet_convert": "from data_loading import resolve_source; resolve_source({path!r})",
+    "parquet_mmap": "from data_loading import load_transaction_data; load_transaction_data({path!r})",
+    "stream_aggregates": "from data_loading import stream_dashboard_aggregates; stream_dashboard_aggregates({path!r})",
+}
+
+def _run_case(snippet):
+    # Processus séparé par cas : le pic de RSS mesuré est celui du cas seul
+    code = ("import time, resource, json; t = time.perf_counter(); " + snippet +
+            "; print(json.dumps({'seconds': time.perf_counter() - t, "
+            "'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024}))")
+    output = subprocess.run([sys.executable, "-W", "ignore", "-c", code], check=True, capture_output=True,
+                            text=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description="Chargement par morceaux des transactions")
+    sub = parser.add_subparsers(dest="command", required=True)
+    convert_parser = sub.add_parser("convert", help="Convertit un CSV en cache Parquet")
+    convert_parser.add_argument("--data", default=DATA_PATH)
+    bench_parser = sub.add_parser("bench", help="Temps de chargement et pic de RSS")
+    bench_parser.add_argument("--data", default=DATA_PATH)
+    bench_parser.add_argument("--rows", type=int, default=10_000_000, help="Taille du fichier synthétique (0 = aucun)")
+    bench_parser.add_argument("--synthetic-path", default=os.path.join(CACHE_DIR, "synthetic_transactions.csv"))
+    args = parser.parse_args()
+
+    if args.command == "convert":
+        print(f"Cache Parquet : {resolve_source(args.data)}")
+        return
+
+    files = [args.data]
+    if args.rows:
+        os.makedirs(os.path.dirname(args.synthetic_path) or ".", exist_ok=True)
+        files.append(write_synthetic_csv(args.synthetic_path, args.rows))
+    for path in files:
+        cache_path = parquet_cache_path(path)
+        if os.path.exists(cache_path):
+            os.remove(cache_path)
+        print(f"\n{path} ({os.path.getsize(path) / 1e6:.1f} Mo)")
+        for name, snippet in _BENCH_CASES.items():
+            result = _run_case(snippet.format(path=path))
+            print(f"  {name:<18} {result['seconds']:8.2f} s   pic RSS {result['peak_rss_mb']:9.1f} Mo")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""Micro-batching des prédictions unitaires, partagé entre sessions.
+
+Chaque soumission du formulaire produit une seule ligne encodée. Plutôt que
+d'appeler predict_proba depuis le thread de chaque session, les lignes sont
+déposées dans une file commune ; un thread unique les regroupe (fenêtre de
+quelques millisecondes ou taille de lot maximale) et fait un seul appel
+vectorisé, puis rend à chaque session sa propre ligne de résultat.
+
+    python dispatcher.py bench --clients 32 --requests 50   # direct vs micro-batch
+"""
+import argparse
+import os
+import queue
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import Future
+
+import numpy as np
+
+BATCH_WINDOW_MS = float(os.environ.get("FRAUDE_BATCH_WINDOW_MS", "2"))
+BATCH_MAX_SIZE = int(os.environ.get("FRAUDE_BATCH_MAX_SIZE", "64"))
+
+class MicroBatchDispatcher:
+    def __init__(self, model=None, window_ms=BATCH_WINDOW_MS, max_batch=BATCH_MAX_SIZE, stats_window=10_000):
+        if max_batch < 1:
+            raise ValueError("max_batch doit être >= 1")
+        self.model = model
+        self.window_ms = window_ms
+        self.max_batch = max_batch
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._wait_ms = deque(maxlen=stats_window)
+        self._inference_ms = deque(maxlen=stats_window)
+        self.batch_sizes = Counter()
+        self.requests = 0
+        self.batches = 0
+        self.errors = 0
+        self.max_queue_depth = 0
+        self._closed = False
+        self._worker = threading.Thread(target=self._run, name="micro-batch", daemon=True)
+        self._worker.start()
+
+    def bind_model(self, model):
+        # Nouveau modèle (model.pkl modifié) : utilisé à partir du prochain lot
+        self.model = model
+
+    def submit(self, vector):
+        # Une ligne encodée -> Future du vecteur de probabilités de cette ligne
+        if self._closed:
+            raise RuntimeError("Le dispatcher est arrêté")
+        row = np.asarray(vector, dtype=np.float64).reshape(1, -1)
+        future = Future()
+        self._queue.put((row, future, time.perf_counter()))
+        with self._lock:
+            self.requests += 1
+            self.max_queue_depth = max(self.max_queue_depth, self._queue.qsize())
+        return future
+
+    def predict_proba(self, vector, timeout=None):
+        return self.submit(vector).result(timeout)
+
+    def _collect(self):
+        # Bloque jusqu'à la première requête, puis attend la fin de la fenêtre ou un lot plein
+        first = self._queue.get()
+        if first is None:
+            return None
+        batch = [first]
+        deadline = time.perf_counter() + self.window_ms / 1000
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                self._queue.put(None)  # Arrêt traité après ce dernier lot
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            if batch is None:
+                return
+            start = time.perf_counter()
+            try:
+                proba = self.model.predict_proba(np.vstack([row for row, _, _ in batch]))
+            except Exception as e:
+                with self._lock:
+                    self.errors += 1
+                for _, future, _ in batch:
+                    future.set_exception(e)
+                continue
+            inference_ms = (time.perf_counter() - start) * 1000
+            for i, (_, future, _) in enumerate(batch):
+                future.set_result(proba[i])
+            with self._lock:
+                self.batches += 1
+                self.batch_sizes[len(batch)] += 1
+                self._inference_ms.append(inference_ms)
+                self._wait_ms.extend((start - enqueued) * 1000 for _, _, enqueued in batch)
+
+    def close(self, timeout=None):
+        if not self._closed:
+            self._closed = True
+            self._queue.put(None)
+            self._worker.join(timeout)
+
+    def stats(self):
+        with self._lock:
+            waits = np.array(self._wait_ms, dtype=np.float64)
+            inference = np.array(self._inference_ms, dtype=np.float64)
+            sizes = dict(sorted(self.batch_sizes.items()))
+            batches, requests, errors = self.batches, self.requests, self.errors
+            max_depth = self.max_queue_depth
+        batched_rows = sum(size * count for size, count in sizes.items())
+        stats = {
+            "window_ms": self.window_ms,
+            "max_batch": self.max_batch,
+            "queue_depth": self._queue.qsize(),
+            "max_queue_depth": max_depth,
+            "requests": requests,
+            "batches": batches,
+            "errors": errors,
+            "mean_batch_size": batched_rows / batches if batches else 0.0,
+            "batch_sizes": sizes,
+            "wait_p50_ms": None, "wait_p99_ms": None, "inference_p50_ms": None,
+        }
+        if waits.size:
+            stats["wait_p50_ms"], stats["wait_p99_ms"] = (float(v) for v in np.percentile(waits, [50, 99]))
+        if inference.size:
+            stats["inference_p50_ms"] = float(np.percentile(inference, 50))
+        return stats
+
+# --- Benchmark ---
+def _run_clients(score_one, rows, clients, requests_per_client):
+    latencies = []
+    lock = threading.Lock()
+
+    def client(offset):
+        local = []
+        for i in range(requests_per_client):
+            start = time.perf_counter()
+            score_one(rows[(offset * requests_per_client + i) % len(rows)])
+            local.append((time.perf_counter() - start) * 1000)
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=client, args=(c,)) for c in range(clients)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    p50, p99 = np.percentile(latencies, [50, 99])
+    return len(latencies) / elapsed, p50, p99
+
+def main():
+    import pandas as pd
+    from scoring import MODEL_PATH, encode_transactions, load_model
+
+    parser = argparse.ArgumentParser(description="Micro-batching des prédictions unitaires")
+    sub = parser.add_subparsers(dest="command", required=True)
+    bench_parser = sub.add_parser("bench", help="Clients concurrents : appels directs vs micro-batch")
+    bench_parser.add_argument("--model", default=MODEL_PATH)
+    bench_parser.add_argument("--backend", default=None, help="auto, bundle, flat ou sklearn")
+    bench_parser.add_argument("--data", default="fraude_bancaire_synthetique_final.csv")
+    bench_parser.add_argument("--clients", type=int, default=32)
+    bench_parser.add_argument("--requests", type=int, default=50, help="Requêtes par client")
+    bench_parser.add_argument("--window-ms", type=float, default=BATCH_WINDOW_MS)
+    bench_parser.add_argument("--max-batch", type=int, default=BATCH_MAX_SIZE)
+    args = parser.parse_args()
+
+    model = load_model(args.model, backend=args.backend)
+    X = encode_transactions(pd.read_csv(args.data).sample(1000, replace=True, random_state=0))
+    rows = [X[i:i + 1] for i in range(len(X))]
+
+    throughput, p50, p99 = _run_clients(model.predict_proba, rows, args.clients, args.requests)
+    print(f"direct       {throughput:9.1f} req/s   p50={p50:8.2f} ms  p99={p99:8.2f} ms")
+    dispatcher = MicroBatchDispatcher(model, window_ms=args.window_ms, max_batch=args.max_batch)
+    throughput, p50, p99 = _run_clients(dispatcher.predict_proba, rows, args.clients, args.requests)
+    dispatcher.close()
+    stats = dispatcher.stats()
+    print(f"micro-batch  {throughput:9.1f} req/s   p50={p50:8.2f} ms  p99={p99:8.2f} ms   "
+          f"lot moyen={stats['mean_batch_size']:.1f}  attente p50={stats['wait_p50_ms']:.2f} ms  "
+          f"file max={stats['max_queue_depth']}")
+
+if __name__ == "__main__":
+    main()
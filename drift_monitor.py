@@ -0,0 +1,325 @@
+"""Surveillance de la dérive des données et de leur qualité, en continu.
+
+Une référence (drift_baseline.json) est construite une fois sur les données
+d'entraînement : histogrammes à bornes fixes (quantiles d'entraînement) pour
+chaque variable numérique, comptes par modalité pour les variables
+catégorielles, taux de valeurs manquantes et hors bornes IQR, taux de fraude
+prédit. DriftMonitor tient les mêmes compteurs pour la production : chaque
+lot scoré ne coûte que O(taille du lot) et la mémoire reste constante, sans
+jamais relire l'historique. Le PSI et le KS (sur les histogrammes cumulés) sont
+calculés à la demande à partir des seuls compteurs.
+
+    python drift_monitor.py baseline            # fraude_bancaire_synthetique_final.csv -> drift_baseline.json
+    python drift_monitor.py report --data nouveau_lot.csv
+"""
+import argparse
+import atexit
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from preprocessing import LABEL_COLUMNS, FREQUENCY_COLUMNS, NUMERIC_COLUMNS, CATEGORY_ALIASES
+
+logger = logging.getLogger("fraude.drift")
+
+BASELINE_PATH = "drift_baseline.json"
+STATE_PATH = os.path.join(".cache", "drift_state.json")
+BASELINE_VERSION = 1
+N_BINS = 20
+CATEGORICAL_COLUMNS = LABEL_COLUMNS + FREQUENCY_COLUMNS
+OTHER_CATEGORY = "__autre__"
+PREDICTION_COLUMN = "prediction_fraude"
+PSI_EPSILON = 1e-4
+# Seuils usuels du PSI
+PSI_MODERATE = 0.1
+PSI_MAJOR = 0.25
+MIN_ROWS = 200  # En dessous, le PSI reflète surtout le bruit d'échantillonnage
+
+def _category_counts(col, values):
+    # Comptage sur les valeurs brutes puis normalisation des seules modalités distinctes
+    # (mêmes équivalences de saisie que le prétraitement : Femme -> femelle...)
+    counts = values.dropna().value_counts()
+    aliases = CATEGORY_ALIASES.get(col, {})
+    canonical = [aliases.get(v, v) for v in counts.index.astype(str).str.strip().str.lower()]
+    return counts.groupby(canonical).sum()
+
+# --- Référence d'Entraînement ---
+def build_baseline(df, preprocessor, predictions=None, n_bins=N_BINS):
+    features = {}
+    for col in NUMERIC_COLUMNS:
+        values = pd.to_numeric(df[col], errors="coerce")
+        present = values.dropna().to_numpy(np.float64)
+        # Bornes intérieures = quantiles d'entraînement : chaque case contient ~1/n_bins de la référence
+        edges = np.unique(np.quantile(present, np.linspace(0, 1, n_bins + 1)[1:-1]))
+        low, high = preprocessor.clip_bounds[col]
+        features[col] = {
+            "type": "numeric",
+            "edges": edges.tolist(),
+            "counts": _numeric_counts(present, edges).tolist(),
+            "missing": int(values.isna().sum()),
+            "out_of_bounds": int(((present < low) | (present > high)).sum()),
+            "clip_bounds": [low, high],
+        }
+    for col in CATEGORICAL_COLUMNS:
+        counts = _category_counts(col, df[col])
+        features[col] = {
+            "type": "categorical",
+            "categories": {str(k): int(v) for k, v in counts.items()},
+            "missing": int(df[col].isna().sum()),
+        }
+    baseline = {"version": BASELINE_VERSION, "rows": int(len(df)), "features": features, "created": time.time()}
+    if predictions is not None:
+        baseline["fraud_rate"] = float(np.mean(predictions))
+    return baseline
+
+def save_baseline(baseline, path=BASELINE_PATH):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(baseline, f, indent=2, ensure_ascii=False)
+
+def load_baseline(path=BASELINE_PATH):
+    with open(path, encoding="utf-8") as f:
+        baseline = json.load(f)
+    if baseline.get("version") != BASELINE_VERSION:
+        raise ValueError(f"Version de référence de dérive non supportée : {baseline.get('version')}")
+    return baseline
+
+def _numeric_counts(values, edges):
+    # Cases (-inf, e0], (e0, e1], ..., (e_n, +inf) : len(edges) + 1 compteurs
+    return np.bincount(np.searchsorted(edges, values, side="left"), minlength=len(edges) + 1)
+
+# --- Statistiques ---
+def psi(expected_counts, actual_counts, epsilon=PSI_EPSILON):
+    expected = np.asarray(expected_counts, dtype=np.float64)
+    actual = np.asarray(actual_counts, dtype=np.float64)
+    if expected.sum() == 0 or actual.sum() == 0:
+        return None
+    p = np.clip(expected / expected.sum(), epsilon, None)
+    q = np.clip(actual / actual.sum(), epsilon, None)
+    return float(np.sum((q - p) * np.log(q / p)))
+
+def ks_binned(expected_counts, actual_counts):
+    # Statistique KS sur les fonctions de répartition aux bornes des cases (approximation par histogramme)
+    expected = np.asarray(expected_counts, dtype=np.float64)
+    actual = np.asarray(actual_counts, dtype=np.float64)
+    if expected.sum() == 0 or actual.sum() == 0:
+        return None
+    return float(np.abs(np.cumsum(expected) / expected.sum() - np.cumsum(actual) / actual.sum()).max())
+
+def drift_status(value, rows=MIN_ROWS):
+    if value is None:
+        return "—"
+    if rows < MIN_ROWS:
+        return "⚪ échantillon insuffisant"
+    if value >= PSI_MAJOR:
+        return "🔴 forte"
+    if value >= PSI_MODERATE:
+        return "🟠 modérée"
+    return "🟢 stable"
+
+# --- Surveillance en Production ---
+class DriftMonitor:
+    def __init__(self, baseline, state_path=None, save_interval=30.0):
+        self.baseline = baseline
+        self.state_path = state_path
+        self.save_interval = save_interval
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._last_save = time.monotonic()
+        self._edges = {col: np.asarray(spec["edges"]) for col, spec in baseline["features"].items()
+                       if spec["type"] == "numeric"}
+        self.reset()
+        if state_path:
+            if os.path.exists(state_path):
+                try:
+                    self._load_state(state_path)
+                except (OSError, ValueError, KeyError) as e:
+                    logger.warning("État de dérive '%s' illisible (%s) : compteurs remis à zéro", state_path, e)
+            atexit.register(self._save_quietly)
+
+    def reset(self):
+        with self._lock:
+            self.rows = 0
+            self.fraud_predictions = 0
+            self.scored = 0
+            self.updated = None
+            self.counts = {col: np.zeros(len(edges) + 1, dtype=np.int64) for col, edges in self._edges.items()}
+            self.categories = {col: {} for col, spec in self.baseline["features"].items() if spec["type"] == "categorical"}
+            self.missing = {col: 0 for col in self.baseline["features"]}
+            self.out_of_bounds = {col: 0 for col in self._edges}
+
+    def update(self, df, predictions=None):
+        # O(len(df)) : un searchsorted + bincount par variable numérique, un value_counts par catégorielle
+        numeric = {}
+        for col, edges in self._edges.items():
+            if col not in df.columns:
+                continue
+            values = pd.to_numeric(df[col], errors="coerce").to_numpy(np.float64)
+            present = values[~np.isnan(values)]
+            low, high = self.baseline["features"][col]["clip_bounds"]
+            numeric[col] = (_numeric_counts(present, edges), values.size - present.size,
+                            int(((present < low) | (present > high)).sum()))
+        categorical = {}
+        for col in self.categories:
+            if col not in df.columns:
+                continue
+            categorical[col] = (_category_counts(col, df[col]), int(df[col].isna().sum()))
+        with self._lock:
+            self.rows += len(df)
+            for col, (counts, missing, outside) in numeric.items():
+                self.counts[col] += counts
+                self.missing[col] += missing
+                self.out_of_bounds[col] += outside
+            for col, (counts, missing) in categorical.items():
+                # Modalités hors référence regroupées sous OTHER_CATEGORY : le stock reste borné
+                # par la taille de la référence, quelles que soient les saisies libres du flux
+                store, reference = self.categories[col], self.baseline["features"][col]["categories"]
+                for category, count in counts.items():
+                    key = str(category) if str(category) in reference else OTHER_CATEGORY
+                    store[key] = store.get(key, 0) + int(count)
+                self.missing[col] += missing
+            if predictions is not None:
+                predictions = np.asarray(predictions)
+                self.scored += predictions.size
+                self.fraud_predictions += int((predictions == 1).sum())
+            self.updated = time.time()
+        self._maybe_save()
+
+    def _category_vectors(self, col):
+        # Modalités de la référence + une case pour toutes les modalités inconnues
+        reference = self.baseline["features"][col]["categories"]
+        current = self.categories[col]
+        names = list(reference)
+        expected = [reference[name] for name in names] + [0]
+        actual = [current.get(name, 0) for name in names] + [sum(v for k, v in current.items() if k not in reference)]
+        return names + [OTHER_CATEGORY], expected, actual
+
+    def report(self):
+        with self._lock:
+            features = []
+            for col, spec in self.baseline["features"].items():
+                total = self.rows
+                row = {"feature": col, "type": spec["type"],
+                       "missing_rate": self.missing[col] / total if total else None,
+                       "baseline_missing_rate": spec["missing"] / self.baseline["rows"]}
+                if spec["type"] == "numeric":
+                    expected, actual = spec["counts"], self.counts[col]
+                    edges = spec["edges"]
+                    labels = [f"≤ {edges[0]:.4g}"] + [f"{a:.4g} – {b:.4g}" for a, b in zip(edges[:-1], edges[1:])] + [f"> {edges[-1]:.4g}"]
+                    present = int(np.sum(actual))
+                    row.update(ks=ks_binned(expected, actual),
+                               out_of_bounds_rate=self.out_of_bounds[col] / present if present else None,
+                               baseline_out_of_bounds_rate=spec["out_of_bounds"] / max(1, sum(expected)))
+                else:
+                    labels, expected, actual = self._category_vectors(col)
+                    row.update(ks=None, out_of_bounds_rate=None, baseline_out_of_bounds_rate=None,
+                               unseen_rate=actual[-1] / sum(actual) if sum(actual) else None)
+                row.update(psi=psi(expected, actual), bins=labels,
+                           expected=np.asarray(expected, dtype=np.float64).tolist(),
+                           actual=np.asarray(actual, dtype=np.float64).tolist())
+                row["status"] = drift_status(row["psi"], int(np.sum(actual)))
+                features.append(row)
+            fraud_rate = self.fraud_predictions / self.scored if self.scored else None
+            return {
+                "rows": self.rows,
+                "updated": self.updated,
+                "fraud_rate": fraud_rate,
+                "baseline_fraud_rate": self.baseline.get("fraud_rate"),
+                "features": features,
+            }
+
+    # --- Persistance de l'état (compteurs seulement, taille constante) ---
+    def to_dict(self):
+        with self._lock:
+            return {
+                "version": BASELINE_VERSION,
+                "baseline_created": self.baseline.get("created"),
+                "rows": self.rows, "scored": self.scored, "fraud_predictions": self.fraud_predictions,
+                "updated": self.updated,
+                "counts": {col: counts.tolist() for col, counts in self.counts.items()},
+                "categories": self.categories,
+                "missing": self.missing,
+                "out_of_bounds": self.out_of_bounds,
+            }
+
+    def _load_state(self, path):
+        with open(path, encoding="utf-8") as f:
+            state = json.load(f)
+        if state.get("baseline_created") != self.baseline.get("created"):
+            return  # Nouvelle référence : les compteurs de l'ancienne ne sont pas comparables
+        with self._lock:
+            self.rows, self.scored = state["rows"], state["scored"]
+            self.fraud_predictions, self.updated = state["fraud_predictions"], state["updated"]
+            self.counts = {col: np.asarray(counts, dtype=np.int64) for col, counts in state["counts"].items()}
+            self.categories, self.missing, self.out_of_bounds = state["categories"], state["missing"], state["out_of_bounds"]
+
+    def save(self, path=None):
+        # Fichier temporaire propre à chaque appel (même dossier) puis remplacement atomique
+        path = path or self.state_path
+        directory = os.path.dirname(path) or "."
+        os.makedirs(directory, exist_ok=True)
+        state = self.to_dict()
+        with self._save_lock:
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=os.path.basename(path) + ".", suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(state, f)
+                os.replace(tmp_path, path)
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+            self._last_save = time.monotonic()
+
+    def _save_quietly(self):
+        # Sauvegarde déclenchée par le scoring ou à la sortie : un échec est journalisé, jamais propagé
+        try:
+            self.save()
+        except Exception:
+            logger.exception("Sauvegarde de l'état de dérive '%s' impossible", self.state_path)
+
+    def _maybe_save(self):
+        if self.state_path and time.monotonic() - self._last_save >= self.save_interval:
+            self._last_save = time.monotonic()  # Prochaine tentative dans save_interval, même en cas d'échec
+            self._save_quietly()
+
+def main():
+    from preprocessing import FraudPreprocessor, PREPROCESSOR_PATH
+
+    parser = argparse.ArgumentParser(description="Dérive des données de production vs entraînement")
+    sub = parser.add_subparsers(dest="command", required=True)
+    baseline_parser = sub.add_parser("baseline", help="Construit la référence à partir des données d'entraînement")
+    baseline_parser.add_argument("--data", default="fraude_bancaire_synthetique_final.csv")
+    baseline_parser.add_argument("--out", default=BASELINE_PATH)
+    baseline_parser.add_argument("--bins", type=int, default=N_BINS)
+    report_parser = sub.add_parser("report", help="PSI / KS d'un fichier par rapport à la référence")
+    report_parser.add_argument("--data", required=True)
+    report_parser.add_argument("--baseline", default=BASELINE_PATH)
+    args = parser.parse_args()
+
+    from scoring import score_frame
+    if args.command == "baseline":
+        df = pd.read_csv(args.data)
+        predictions = (score_frame(df)["prediction"] == "Fraude").to_numpy()
+        save_baseline(build_baseline(df, FraudPreprocessor.load(PREPROCESSOR_PATH), predictions, args.bins), args.out)
+        print(f"Référence de dérive enregistrée dans '{args.out}' ({len(df)} lignes)")
+        return
+
+    monitor = DriftMonitor(load_baseline(args.baseline))
+    for chunk in pd.read_csv(args.data, chunksize=100_000):
+        monitor.update(chunk, (score_frame(chunk)["prediction"] == "Fraude").to_numpy(dtype=int))
+    report = monitor.report()
+    fraud_rate, baseline_rate = (("—" if value is None else f"{value:.2%}")
+                                 for value in (report["fraud_rate"], report["baseline_fraud_rate"]))
+    print(f"{report['rows']} lignes ; taux de fraude prédit {fraud_rate} (référence {baseline_rate})")
+    for row in report["features"]:
+        psi_value = "—" if row["psi"] is None else f"{row['psi']:.3f}"
+        ks = "" if row["ks"] is None else f"  KS {row['ks']:.3f}"
+        print(f"  {row['feature']:<22} PSI {psi_value}{ks}  {row['status']}")
+
+if __name__ == "__main__":
+    main()
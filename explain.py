@@ -0,0 +1,123 @@
+"""Contributions par variable des prédictions de la forêt (décomposition par chemins).
+
+Pour chaque arbre, la probabilité de fraude part de la valeur de la racine et
+varie à chaque nœud traversé ; la variation est créditée à la variable testée
+par le nœud parent. La moyenne sur les arbres donne, pour chaque transaction :
+proba_fraude = biais + somme des contributions. Le calcul est vectorisé sur
+toutes les paires (ligne, arbre) par forest_engine.FlatForest.contributions.
+
+    python explain.py --rows 1000   # latence vs boucle naïve par arbre
+"""
+import argparse
+import threading
+import time
+
+import numpy as np
+
+from forest_engine import FlatForest
+from preprocessing import FEATURE_ORDER
+
+FEATURE_LABELS = {
+    "age": "Âge",
+    "salaire": "Salaire",
+    "score_credit": "Score de Crédit",
+    "montant_transaction": "Montant Transaction",
+    "anciennete_compte": "Ancienneté du Compte",
+    "type_carte": "Type de Carte",
+    "region": "Région",
+    "genre": "Genre",
+}
+TOP_K = 5
+
+# --- Forêt Aplatie (modèle scikit-learn converti une fois) ---
+_flat_forests = {}
+_flat_lock = threading.Lock()
+
+def flat_forest_for(model):
+    if isinstance(model, FlatForest):
+        return model
+    with _flat_lock:
+        cached = _flat_forests.get(id(model))
+        if cached is None or cached[0] is not model:
+            # Le modèle est gardé avec sa conversion : son id ne peut pas être réutilisé tant qu'elle est en cache
+            _flat_forests.clear()
+            cached = (model, FlatForest.from_sklearn(model))
+            _flat_forests[id(model)] = cached
+        return cached[1]
+
+# --- Contributions ---
+def feature_contributions(model, X, class_index=1):
+    # (biais, contributions[n_lignes, n_variables]) pour la classe demandée
+    return flat_forest_for(model).contributions(X, class_index)
+
+def feature_names(model):
+    names = getattr(model, "feature_names_in_", None)
+    return list(names) if names is not None else list(FEATURE_ORDER)
+
+def top_contributions(contributions_row, names, k=TOP_K):
+    # Les k variables au plus fort effet (en valeur absolue), positives = vers la fraude
+    order = np.argsort(-np.abs(contributions_row))[:k]
+    return [(names[i], float(contributions_row[i])) for i in order]
+
+def explanation_rows(model, X, k=TOP_K):
+    # Explications prêtes à afficher pour chaque ligne encodée de X
+    bias, contributions = feature_contributions(model, X)
+    names = feature_names(model)
+    return [{"biais": float(b), "facteurs": top_contributions(row, names, k)} for b, row in zip(bias, contributions)]
+
+def format_factors(factors, raw_values=None):
+    # [(variable, contribution)] -> [[libellé, valeur saisie, "+12.3 pts"]] (affichage et rapport PDF)
+    raw_values = raw_values or {}
+    return [[FEATURE_LABELS.get(name, name), str(raw_values.get(name, "")), f"{contribution * 100:+.1f} pts"]
+            for name, contribution in factors]
+
+# --- Benchmark ---
+def _naive_contributions(model, X, class_index=1):
+    # Référence : un decision_path par arbre, boucle Python sur les nœuds du chemin
+    contributions = np.zeros(X.shape, dtype=np.float64)
+    X = np.asarray(X, dtype=np.float32)
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+        value = tree.value[:, 0, :] / tree.value[:, 0, :].sum(axis=1, keepdims=True)
+        paths = estimator.decision_path(X)
+        for i in range(X.shape[0]):
+            path = paths.indices[paths.indptr[i]:paths.indptr[i + 1]]
+            for parent, child in zip(path[:-1], path[1:]):
+                contributions[i, tree.feature[parent]] += value[child, class_index] - value[parent, class_index]
+    return contributions / len(model.estimators_)
+
+def main():
+    import pandas as pd
+    from scoring import MODEL_PATH, encode_transactions, load_model
+
+    parser = argparse.ArgumentParser(description="Contributions par variable : exactitude et latence")
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--data", default="fraude_bancaire_synthetique_final.csv")
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    model = load_model(args.model, backend="sklearn")
+    X = encode_transactions(pd.read_csv(args.data))
+    X = X[np.arange(args.rows) % X.shape[0]]
+    bias, contributions = feature_contributions(model, X)
+    proba = model.predict_proba(X)[:, 1]
+    print(f"Écart max |biais + Σ contributions - proba| : {np.abs(bias + contributions.sum(axis=1) - proba).max():.3e}")
+
+    row = X[:1]
+    samples = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        feature_contributions(model, row)
+        samples.append((time.perf_counter() - start) * 1000)
+    start = time.perf_counter()
+    naive = _naive_contributions(model, row)
+    naive_ms = (time.perf_counter() - start) * 1000
+    print(f"1 ligne      vectorisé p50 {np.median(samples):8.3f} ms   naïf {naive_ms:8.1f} ms   "
+          f"écart {np.abs(naive - feature_contributions(model, row)[1]).max():.1e}")
+    start = time.perf_counter()
+    feature_contributions(model, X)
+    print(f"{args.rows:>5} lignes vectorisé {(time.perf_counter() - start) * 1000:8.1f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+"""Moteur d'inférence « aplati » pour la RandomForest de model.pkl.
+
+Tous les arbres sont concaténés dans des tableaux NumPy plats (feature,
+threshold, left, right, value) et parcourus ensemble, niveau par niveau :
+chaque itération fait avancer d'un nœud toutes les paires (ligne, arbre).
+On évite ainsi le dispatch Python par estimateur de scikit-learn.
+
+    python forest_engine.py            # équivalence + latence vs predict_proba
+"""
+import argparse
+import time
+
+import numpy as np
+
+ROW_BLOCK = 1024  # Lignes traitées ensemble (ROW_BLOCK x n_arbres paires restent en cache)
+COMPACT_RATIO = 0.75  # Paires terminées retirées seulement quand il en reste moins de 75 % d'actives
+
+class FlatForest:
+    def __init__(self, feature, threshold, children, value, roots, max_depth, classes,
+                 n_features, feature_names=None):
+        self.feature = feature
+        self.threshold = threshold
+        # Enfants entrelacés : children[2 * nœud + aller_à_gauche] donne le nœud suivant en un seul accès
+        self.children = children
+        self.value = value
+        self.roots = roots
+        self.max_depth = int(max_depth)
+        self.classes_ = np.asarray(classes)
+        self.n_features_in_ = int(n_features)
+        self.feature_names_in_ = None if feature_names is None else np.asarray(feature_names, dtype=object)
+        self.is_leaf = self.left == np.arange(self.left.size, dtype=self.left.dtype)
+        # Une colonne contiguë par classe : les sommes sur les feuilles évitent un accès à pas de 2
+        self._class_values = [np.ascontiguousarray(self.value[:, k]) for k in range(self.value.shape[1])]
+
+    @property
+    def left(self):
+        return self.children[1::2]
+
+    @property
+    def right(self):
+        return self.children[0::2]
+
+    @classmethod
+    def from_sklearn(cls, model):
+        features, thresholds, children, values, roots = [], [], [], [], []
+        offset = 0
+        for estimator in model.estimators_:
+            tree = estimator.tree_
+            n = tree.node_count
+            node_ids = np.arange(offset, offset + n, dtype=np.int32)
+            leaf = tree.children_left == -1
+            # Les feuilles pointent sur elles-mêmes : le parcours y reste une fois arrivé
+            left = np.where(leaf, node_ids, tree.children_left + offset)
+            right = np.where(leaf, node_ids, tree.children_right + offset)
+            children.append(np.stack([right, left], axis=1).ravel().astype(np.int32))
+            features.append(np.where(leaf, 0, tree.feature).astype(np.int32))
+            thresholds.append(np.where(leaf, 0.0, tree.threshold).astype(np.float64))
+            # Même normalisation que DecisionTreeClassifier.predict_proba
+            value = tree.value[:, 0, :].astype(np.float64)
+            normalizer = value.sum(axis=1, keepdims=True)
+            normalizer[normalizer == 0.0] = 1.0
+            values.append(value / normalizer)
+            roots.append(offset)
+            offset += n
+        return cls(
+            feature=np.concatenate(features),
+            threshold=np.concatenate(thresholds),
+            children=np.concatenate(children),
+            value=np.concatenate(values),
+            roots=np.asarray(roots, dtype=np.int32),
+            max_depth=max(e.tree_.max_depth for e in model.estimators_),
+            classes=model.classes_,
+            n_features=model.n_features_in_,
+            feature_names=getattr(model, "feature_names_in_", None),
+        )
+
+    @property
+    def n_estimators(self):
+        return self.roots.size
+
+    @property
+    def nbytes(self):
+        return sum(getattr(self, name).nbytes for name in ("feature", "threshold", "children", "value", "roots"))
+
+    # --- Variantes Compactes (voir compaction.py) ---
+    def _take_nodes(self, nodes, roots):
+        # Nouvelle forêt réduite aux nœuds `nodes` (dans cet ordre) ; roots : anciens indices des racines gardées
+        new_index = np.full(self.feature.size, -1, dtype=np.int32)
+        new_index[nodes] = np.arange(nodes.size, dtype=np.int32)
+        children = new_index[self.children.reshape(-1, 2)[nodes]].ravel()
+        forest = FlatForest(
+            feature=self.feature[nodes], threshold=self.threshold[nodes], children=children,
+            value=self.value[nodes], roots=new_index[roots], max_depth=self.max_depth, classes=self.classes_,
+            n_features=self.n_features_in_, feature_names=self.feature_names_in_)
+        forest.max_depth = int(forest.node_depths()[forest.is_leaf].max())
+        return forest
+
+    def node_depths(self):
+        # Profondeur de chaque nœud (-1 si inaccessible), calculée niveau par niveau depuis les racines
+        depth = np.full(self.feature.size, -1, dtype=np.int32)
+        frontier, level = self.roots, 0
+        while frontier.size:
+            depth[frontier] = level
+            frontier = frontier[~self.is_leaf[frontier]]
+            frontier = np.concatenate([self.left[frontier], self.right[frontier]])
+            level += 1
+        return depth
+
+    def select_trees(self, indices):
+        # Sous-forêt des arbres `indices`, dans cet ordre (l'ordre compte pour l'arrêt anticipé)
+        ends = np.append(self.roots[1:], self.feature.size)
+        indices = np.asarray(indices, dtype=np.intp)
+        nodes = np.concatenate([np.arange(self.roots[i], ends[i], dtype=np.int32) for i in indices])
+        return self._take_nodes(nodes, self.roots[indices])
+
+    def truncate(self, max_depth):
+        # Arbres coupés à max_depth : les nœuds à cette profondeur deviennent des feuilles
+        # (leur value est déjà la distribution des classes de leurs échantillons)
+        depth = self.node_depths()
+        feature, threshold, children = self.feature.copy(), self.threshold.copy(), self.children.copy()
+        cut = np.flatnonzero((depth == max_depth) & ~self.is_leaf)
+        feature[cut], threshold[cut] = 0, 0.0
+        children[2 * cut], children[2 * cut + 1] = cut, cut
+        forest = FlatForest(feature, threshold, children, self.value, self.roots, self.max_depth, self.classes_,
+                            self.n_features_in_, self.feature_names_in_)
+        return forest._take_nodes(np.flatnonzero((depth >= 0) & (depth <= max_depth)).astype(np.int32), self.roots)
+
+    def to_float32(self):
+        # Seuils arrondis vers le bas en float32 : pour x float32, x <= seuil32 <=> x <= seuil64 (aucun écart de feuille)
+        threshold = self.threshold.astype(np.float32)
+        above = threshold.astype(np.float64) > self.threshold
+        threshold[above] = np.nextafter(threshold[above], np.float32(-np.inf))
+        feature = self.feature.astype(np.int16) if self.n_features_in_ <= np.iinfo(np.int16).max else self.feature
+        return FlatForest(feature, threshold, self.children, self.value.astype(np.float32), self.roots, self.max_depth,
+                          self.classes_, self.n_features_in_, self.feature_names_in_)
+
+    def apply(self, X):
+        # Indice (global) de la feuille atteinte par chaque ligne dans chaque arbre
+        # scikit-learn compare en float32 : on fait de même pour obtenir les mêmes feuilles
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(f"X doit avoir {self.n_features_in_} colonnes, reçu {X.shape}")
+        n_rows, n_features = X.shape
+        # Valeurs float32 exactes en float64 : même comparaison, sans conversion à chaque niveau
+        flat_X = X.astype(np.float64).ravel()
+        leaves = np.tile(self.roots, n_rows)
+        # Seules les paires (ligne, arbre) pas encore arrivées à une feuille continuent le parcours ;
+        # les feuilles pointant sur elles-mêmes, les paires terminées ne sont retirées que par vagues
+        active = np.arange(leaves.size)
+        node = leaves.copy()
+        row_offset = np.repeat(np.arange(n_rows, dtype=np.intp) * n_features, self.n_estimators)
+        for _ in range(self.max_depth):
+            go_left = flat_X.take(row_offset + self.feature.take(node)) <= self.threshold.take(node)
+            node = self.children.take(2 * node + go_left)
+            done = self.is_leaf.take(node)
+            remaining = node.size - np.count_nonzero(done)
+            if remaining == 0:
+                break
+            if remaining <= COMPACT_RATIO * node.size:
+                leaves[active[done]] = node[done]
+                keep = ~done
+                active, node, row_offset = active[keep], node[keep], row_offset[keep]
+        leaves[active] = node
+        return leaves.reshape(n_rows, self.n_estimators)
+
+    def predict_proba(self, X):
+        X = np.asarray(X)
+        out = np.empty((X.shape[0], self.classes_.size), dtype=np.float64)
+        for start in range(0, X.shape[0], ROW_BLOCK):
+            leaves = self.apply(X[start:start + ROW_BLOCK])
+            for k, class_values in enumerate(self._class_values):
+                out[start:start + ROW_BLOCK, k] = class_values.take(leaves).sum(axis=1) / self.n_estimators
+        return out
+
+    def _edge_tables(self, class_index):
+        # Pour chaque nœud non racine : variable testée par son parent et variation de probabilité en y entrant
+        tables = getattr(self, "_edge_cache", {})
+        if class_index not in tables:
+            internal = np.flatnonzero(~self.is_leaf)
+            edge_feature = np.zeros(self.feature.size, dtype=np.intp)
+            edge_delta = np.zeros(self.feature.size, dtype=np.float64)
+            for child in (self.left[internal], self.right[internal]):
+                edge_feature[child] = self.feature[internal]
+                edge_delta[child] = self.value[child, class_index] - self.value[internal, class_index]
+            tables[class_index] = (edge_feature, edge_delta)
+            self._edge_cache = tables
+        return tables[class_index]
+
+    def _block_contributions(self, X, edge_feature, edge_delta, class_index):
+        n_rows, n_features = X.shape
+        flat_X = X.ravel()
+        contributions = np.zeros(n_rows * n_features, dtype=np.float64)
+        node = np.tile(self.roots, n_rows)
+        pair_row = np.repeat(np.arange(n_rows, dtype=np.intp), self.n_estimators)
+        row_offset = pair_row * n_features
+        for _ in range(self.max_depth):
+            go_left = flat_X.take(row_offset + self.feature.take(node)) <= self.threshold.take(node)
+            node = self.children.take(2 * node + go_left)
+            # Chaque arête du chemin crédite sa variation de probabilité à la variable testée
+            contributions += np.bincount(row_offset + edge_feature.take(node), weights=edge_delta.take(node),
+                                         minlength=contributions.size)
+            remaining = ~self.is_leaf.take(node)
+            if not remaining.all():
+                node, row_offset = node[remaining], row_offset[remaining]
+                if node.size == 0:
+                    break
+        bias = self.value[self.roots, class_index].mean()
+        return np.full(n_rows, bias), contributions.reshape(n_rows, n_features) / self.n_estimators
+
+    def contributions(self, X, class_index=1):
+        # Décomposition par chemins (Saabas), tous les arbres à la fois :
+        # proba[:, class_index] = biais + contributions.sum(axis=1)
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(f"X doit avoir {self.n_features_in_} colonnes, reçu {X.shape}")
+        edge_feature, edge_delta = self._edge_tables(class_index)
+        bias = np.empty(X.shape[0], dtype=np.float64)
+        contributions = np.empty(X.shape, dtype=np.float64)
+        for start in range(0, X.shape[0], ROW_BLOCK):
+            stop = start + ROW_BLOCK
+            bias[start:stop], contributions[start:stop] = self._block_contributions(
+                X[start:stop], edge_feature, edge_delta, class_index)
+        return bias, contributions
+
+    def predict(self, X):
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+def max_abs_difference(model, forest, X):
+    return float(np.abs(model.predict_proba(X) - forest.predict_proba(X)).max())
+
+def _median_ms(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return float(np.median(samples))
+
+def main():
+    import pandas as pd
+    from scoring import MODEL_PATH, load_model, encode_transactions
+
+    parser = argparse.ArgumentParser(description="Vérifie et mesure le moteur FlatForest")
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--data", default="fraude_bancaire_synthetique_final.csv")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    model = load_model(args.model, backend="sklearn")
+    forest = FlatForest.from_sklearn(model)
+    X = encode_transactions(pd.read_csv(args.data))
+    diff = max_abs_difference(model, forest, X)
+    same_class = bool((model.predict(X) == forest.predict(X)).all())
+    print(f"{forest.n_estimators} arbres, {forest.feature.size} nœuds, profondeur max {forest.max_depth}")
+    print(f"Écart max predict_proba : {diff:.3e}  (classes identiques : {same_class})")
+
+    row = X[:1]
+    print(f"1 ligne      sklearn {_median_ms(lambda: model.predict_proba(row), args.repeat):8.3f} ms"
+          f"   flat {_median_ms(lambda: forest.predict_proba(row), args.repeat):8.3f} ms")
+    for n in (100, 1_000, 10_000, 100_000):
+        batch = X[np.arange(n) % X.shape[0]]
+        repeat = max(3, args.repeat // max(1, n // 1_000))
+        sk_ms = _median_ms(lambda: model.predict_proba(batch), repeat)
+        flat_ms = _median_ms(lambda: forest.predict_proba(batch), repeat)
+        print(f"{n:>7} lignes sklearn {sk_ms:8.2f} ms ({n / sk_ms * 1000:10.0f} l/s)"
+              f"   flat {flat_ms:8.2f} ms ({n / flat_ms * 1000:10.0f} l/s)")
+
+if __name__ == "__main__":
+    main()
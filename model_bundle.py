@@ -0,0 +1,154 @@
+"""Format d'artefact du modèle : tableaux .npy + manifeste JSON.
+
+La forêt de model.pkl est exportée une fois sous forme de fichiers .npy bruts
+(un par tableau de FlatForest) et d'un manifest.json qui porte la version du
+format, l'ordre des caractéristiques et les encodages. Le chargement passe par
+np.load(mmap_mode="r") : aucune désérialisation, aucune dépendance à la
+version de scikit-learn, et les processus d'une même machine partagent les
+mêmes pages mémoire.
+
+    python model_bundle.py export            # model.pkl -> model_bundle/
+    python model_bundle.py bench             # démarrage à froid pickle vs bundle
+"""
+import argparse
+import hashlib
+import json
+import os
+import subprocess
+import sys
+
+import numpy as np
+
+from forest_engine import FlatForest
+
+BUNDLE_PATH = "model_bundle"
+BUNDLE_FORMAT = "fraude-flat-forest"
+BUNDLE_FORMAT_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+ARRAY_NAMES = ("feature", "threshold", "children", "value", "roots")
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def _encoding_metadata():
+    from scoring import load_preprocessor
+    return {"preprocessor": load_preprocessor().to_dict()}
+
+# --- Export ---
+def export_bundle(forest, out_dir=BUNDLE_PATH, source_path=None, variant=None):
+    # variant : nom de la variante compacte (compaction.py), None pour la forêt complète
+    os.makedirs(out_dir, exist_ok=True)
+    arrays = {}
+    for name in ARRAY_NAMES:
+        array = np.ascontiguousarray(getattr(forest, name))
+        np.save(os.path.join(out_dir, f"{name}.npy"), array, allow_pickle=False)
+        arrays[name] = {"dtype": array.dtype.str, "shape": list(array.shape)}
+    manifest = {
+        "format": BUNDLE_FORMAT,
+        "format_version": BUNDLE_FORMAT_VERSION,
+        "n_estimators": int(forest.n_estimators),
+        "max_depth": forest.max_depth,
+        "n_features": forest.n_features_in_,
+        "classes": forest.classes_.tolist(),
+        "feature_names": None if forest.feature_names_in_ is None else forest.feature_names_in_.tolist(),
+        "encodings": _encoding_metadata(),
+        "variant": variant,
+        "arrays": arrays,
+        "source": None if source_path is None else {
+            "path": os.path.basename(source_path),
+            "sha256": file_sha256(source_path),
+        },
+    }
+    # Le manifeste est écrit en dernier : un bundle sans manifeste est considéré absent
+    tmp_path = os.path.join(out_dir, MANIFEST_NAME + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, os.path.join(out_dir, MANIFEST_NAME))
+    return manifest
+
+# --- Chargement ---
+def bundle_exists(path=BUNDLE_PATH):
+    return os.path.isfile(os.path.join(path, MANIFEST_NAME))
+
+def read_manifest(path=BUNDLE_PATH):
+    with open(os.path.join(path, MANIFEST_NAME), encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("format") != BUNDLE_FORMAT or manifest.get("format_version") != BUNDLE_FORMAT_VERSION:
+        raise ValueError(f"Bundle '{path}' : format {manifest.get('format')} "
+                         f"v{manifest.get('format_version')} non supporté")
+    return manifest
+
+def load_bundle(path=BUNDLE_PATH, mmap=True):
+    manifest = read_manifest(path)
+    arrays = {}
+    for name, spec in manifest["arrays"].items():
+        array = np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r" if mmap else None, allow_pickle=False)
+        if array.dtype.str != spec["dtype"] or list(array.shape) != spec["shape"]:
+            raise ValueError(f"Bundle '{path}' : tableau '{name}' incohérent avec le manifeste")
+        # Vue ndarray simple sur la même projection mémoire (évite le surcoût de la sous-classe memmap)
+        arrays[name] = np.asarray(array)
+    forest = FlatForest(
+        max_depth=manifest["max_depth"],
+        classes=manifest["classes"],
+        n_features=manifest["n_features"],
+        feature_names=manifest["feature_names"],
+        **arrays,
+    )
+    forest.manifest = manifest
+    return forest
+
+def bundle_matches_source(path=BUNDLE_PATH, source_path="model.pkl"):
+    source = read_manifest(path).get("source")
+    return source is not None and source["sha256"] == file_sha256(source_path)
+
+def ensure_bundle(path=BUNDLE_PATH, source_path="model.pkl"):
+    # (Ré)exporte le bundle si absent ou obsolète par rapport à model.pkl
+    if bundle_exists(path) and bundle_matches_source(path, source_path):
+        return read_manifest(path)
+    from scoring import load_model
+    return export_bundle(FlatForest.from_sklearn(load_model(source_path, backend="sklearn")), path, source_path)
+
+# --- Benchmark de démarrage ---
+_PICKLE_SNIPPET = "import pickle; pickle.load(open({path!r}, 'rb'))"
+_BUNDLE_SNIPPET = "from model_bundle import load_bundle; load_bundle({path!r})"
+
+def _cold_start_ms(snippet, runs):
+    # Nouveau processus à chaque mesure : import des bibliothèques compris, comme au démarrage d'un worker
+    code = f"import time; t = time.perf_counter(); {snippet}; print((time.perf_counter() - t) * 1000)"
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, "-W", "ignore", "-c", code], check=True,
+                                capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+        samples.append(float(output.stdout.strip().splitlines()[-1]))
+    return samples
+
+def main():
+    parser = argparse.ArgumentParser(description="Export et benchmark du bundle du modèle")
+    sub = parser.add_subparsers(dest="command", required=True)
+    export_parser = sub.add_parser("export", help="Convertit model.pkl en bundle .npy + manifeste")
+    export_parser.add_argument("--model", default="model.pkl")
+    export_parser.add_argument("--out", default=BUNDLE_PATH)
+    bench_parser = sub.add_parser("bench", help="Compare le temps de démarrage pickle / bundle")
+    bench_parser.add_argument("--model", default="model.pkl")
+    bench_parser.add_argument("--bundle", default=BUNDLE_PATH)
+    bench_parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.command == "export":
+        from scoring import load_model
+        forest = FlatForest.from_sklearn(load_model(args.model, backend="sklearn"))
+        manifest = export_bundle(forest, args.out, source_path=args.model)
+        size = sum(os.path.getsize(os.path.join(args.out, f"{name}.npy")) for name in manifest["arrays"])
+        print(f"Bundle écrit dans '{args.out}' ({manifest['n_estimators']} arbres, {size / 1e6:.2f} Mo)")
+    else:
+        pickle_ms = _cold_start_ms(_PICKLE_SNIPPET.format(path=args.model), args.runs)
+        bundle_ms = _cold_start_ms(_BUNDLE_SNIPPET.format(path=args.bundle), args.runs)
+        print(f"pickle.load  médiane {np.median(pickle_ms):8.1f} ms  (min {min(pickle_ms):.1f})")
+        print(f"bundle mmap  médiane {np.median(bundle_ms):8.1f} ms  (min {min(bundle_ms):.1f})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""Scoring multi-cœurs des gros fichiers de transactions.
+
+Le fichier d'entrée est découpé en plages de lignes (plages d'octets alignées
+sur les fins de ligne pour un CSV, groupes de lignes pour un Parquet), scorées
+dans un pool de processus. Les workers ne désérialisent pas model.pkl : ils
+ouvrent le bundle .npy en mémoire projetée (model_bundle), dont les pages sont
+partagées par le système entre tous les processus. Chaque plage est écrite
+dans un fichier partiel, puis les parties sont concaténées dans l'ordre.
+
+    python parallel_scoring.py score transactions.csv --out scores.csv --workers 4
+    python parallel_scoring.py bench --rows 4000000 --workers 1 2 4 8
+"""
+import argparse
+import hashlib
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+
+import pandas as pd
+
+import model_bundle
+from scoring import MODEL_PATH, score_frame
+
+SHARD_BYTES = 32 * 1024 * 1024  # Taille visée d'une plage CSV (~500 000 lignes du dataset)
+SHARD_ROW_GROUPS = 2  # Groupes de lignes Parquet par plage
+
+def _is_parquet(path):
+    return str(path).lower().endswith(".parquet")
+
+# --- Découpage en Plages ---
+def plan_shards(path, shard_bytes=SHARD_BYTES, shard_row_groups=SHARD_ROW_GROUPS):
+    if _is_parquet(path):
+        import pyarrow.parquet as pq
+        n_groups = pq.ParquetFile(path).metadata.num_row_groups
+        return [("parquet", list(range(start, min(start + shard_row_groups, n_groups))))
+                for start in range(0, n_groups, shard_row_groups)]
+    shards = []
+    with open(path, "rb") as f:
+        f.readline()  # En-tête, recopié dans chaque plage
+        start = f.tell()
+        size = os.fstat(f.fileno()).st_size
+        while start < size:
+            f.seek(min(start + shard_bytes, size))
+            f.readline()  # Fin de plage repoussée à la fin de ligne suivante
+            end = min(f.tell(), size)
+            shards.append(("csv", (start, end)))
+            start = end
+    return shards
+
+def _read_shard(path, shard):
+    kind, spec = shard
+    if kind == "parquet":
+        import pyarrow.parquet as pq
+        return pq.ParquetFile(path, memory_map=True).read_row_groups(spec).to_pandas()
+    start, end = spec
+    with open(path, "rb") as f:
+        header = f.readline()
+        f.seek(start)
+        data = f.read(end - start)
+    return pd.read_csv(BytesIO(header + data))
+
+# --- Workers ---
+_worker_model = None
+
+def _init_worker(bundle_path):
+    # Une projection mémoire par processus, pas de copie du modèle
+    global _worker_model
+    _worker_model = model_bundle.load_bundle(bundle_path)
+
+def _score_shard(path, index, shard, part_path):
+    start = time.perf_counter()
+    scored = score_frame(_read_shard(path, shard), _worker_model)
+    scored.to_csv(part_path, index=False, header=(index == 0))
+    return {"index": index, "rows": len(scored), "frauds": int((scored["prediction"] == "Fraude").sum()),
+            "seconds": time.perf_counter() - start}
+
+# --- Scoring Parallèle ---
+def score_file(input_path, output_path, workers=None, model_path=MODEL_PATH,
+               bundle_path=model_bundle.BUNDLE_PATH, shard_bytes=SHARD_BYTES):
+    workers = workers or os.cpu_count() or 1
+    model_bundle.ensure_bundle(bundle_path, model_path)
+    shards = plan_shards(input_path, shard_bytes)
+    parts_dir = tempfile.mkdtemp(prefix="scoring-parts-", dir=os.path.dirname(os.path.abspath(output_path)))
+    tmp_output = output_path + ".tmp"
+    summary = {"rows": 0, "frauds": 0, "shards": len(shards), "workers": workers}
+    start = time.perf_counter()
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(bundle_path,)) as pool:
+            part_paths = [os.path.join(parts_dir, f"part-{i:05d}.csv") for i in range(len(shards))]
+            results = pool.map(_score_shard, [input_path] * len(shards), range(len(shards)), shards, part_paths)
+            # map rend les résultats dans l'ordre des plages : chaque partie est ajoutée dès qu'elle est prête
+            with open(tmp_output, "wb") as out:
+                for result, part_path in zip(results, part_paths):
+                    with open(part_path, "rb") as part:
+                        shutil.copyfileobj(part, out, 1 << 22)
+                    os.remove(part_path)
+                    summary["rows"] += result["rows"]
+                    summary["frauds"] += result["frauds"]
+        os.replace(tmp_output, output_path)
+    finally:
+        shutil.rmtree(parts_dir, ignore_errors=True)
+        if os.path.exists(tmp_output):
+            os.remove(tmp_output)
+    summary["seconds"] = time.perf_counter() - start
+    return summary
+
+# --- Benchmark ---
+def _file_digest(path):
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 22), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def main():
+    from data_loading import CACHE_DIR, write_synthetic_csv
+
+    parser = argparse.ArgumentParser(description="Scoring parallèle de gros fichiers de transactions")
+    sub = parser.add_subparsers(dest="command", required=True)
+    score_parser = sub.add_parser("score", help="Score un fichier CSV ou Parquet")
+    score_parser.add_argument("input")
+    score_parser.add_argument("--out", required=True, help="CSV de sortie (colonnes d'entrée + proba_fraude, prediction)")
+    score_parser.add_argument("--workers", type=int, default=None, help="Défaut : nombre de cœurs")
+    score_parser.add_argument("--model", default=MODEL_PATH)
+    score_parser.add_argument("--shard-mb", type=float, default=SHARD_BYTES / 2**20)
+    bench_parser = sub.add_parser("bench", help="Passage à l'échelle selon le nombre de workers")
+    bench_parser.add_argument("--rows", type=int, default=4_000_000)
+    bench_parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    bench_parser.add_argument("--model", default=MODEL_PATH)
+    bench_parser.add_argument("--synthetic-path", default=os.path.join(CACHE_DIR, "synthetic_scoring.csv"))
+    args = parser.parse_args()
+
+    if args.command == "score":
+        summary = score_file(args.input, args.out, args.workers, args.model, shard_bytes=int(args.shard_mb * 2**20))
+        print(f"{summary['rows']} lignes ({summary['frauds']} fraudes) en {summary['seconds']:.2f} s "
+              f"- {summary['shards']} plages, {summary['workers']} workers -> '{args.out}'")
+        return
+
+    os.makedirs(os.path.dirname(args.synthetic_path) or ".", exist_ok=True)
+    if not os.path.exists(args.synthetic_path):
+        write_synthetic_csv(args.synthetic_path, args.rows)
+    print(f"{args.synthetic_path} ({os.path.getsize(args.synthetic_path) / 1e6:.1f} Mo), {os.cpu_count()} cœur(s)")
+    baseline, reference = None, None
+    for workers in args.workers:
+        out_path = os.path.join(CACHE_DIR, f"scores-{workers}w.csv")
+        summary = score_file(args.synthetic_path, out_path, workers, args.model)
+        digest = _file_digest(out_path)
+        os.remove(out_path)
+        baseline = baseline or summary["seconds"]
+        reference = reference or digest
+        print(f"  {workers:>2} worker(s) {summary['seconds']:8.2f} s  {summary['rows'] / summary['seconds']:10.0f} lignes/s"
+              f"  accélération x{baseline / summary['seconds']:.2f}  sortie identique : {digest == reference}")
+
+if __name__ == "__main__":
+    main()
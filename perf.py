@@ -0,0 +1,66 @@
+"""Mesure des temps par étape et journal structuré (JSON).
+
+    python perf.py --runs 200   # latences encode / predict_proba sur model.pkl
+"""
+import argparse
+import json
+import logging
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger("fraude.perf")
+
+class StageTimer:
+    # Accumule la durée (ms) de chaque étape nommée, dans l'ordre d'exécution
+    def __init__(self):
+        self.timings_ms = {}
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings_ms[name] = self.timings_ms.get(name, 0.0) + (time.perf_counter() - start) * 1000
+
+    @property
+    def total_ms(self):
+        return sum(self.timings_ms.values())
+
+def log_event(event, **fields):
+    # Une ligne JSON par événement, exploitable par n'importe quel agrégateur de logs
+    logger.info(json.dumps({"event": event, "ts": time.time(), **fields}, default=str))
+
+def log_stage_timings(event, timer, **fields):
+    log_event(event, timings_ms={k: round(v, 3) for k, v in timer.timings_ms.items()},
+              total_ms=round(timer.total_ms, 3), **fields)
+
+def main():
+    import numpy as np
+    import pandas as pd
+    from scoring import MODEL_PATH, load_model, encode_transactions
+
+    parser = argparse.ArgumentParser(description="Latence par étape d'une prédiction unitaire")
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--data", default="fraude_bancaire_synthetique_final.csv")
+    parser.add_argument("--runs", type=int, default=200)
+    args = parser.parse_args()
+
+    model = load_model(args.model)
+    rows = pd.read_csv(args.data).sample(args.runs, replace=True, random_state=0)
+    samples = {"encode": [], "predict_proba": []}
+    for i in range(args.runs):
+        timer = StageTimer()
+        with timer.stage("encode"):
+            X = encode_transactions(rows.iloc[[i]])
+        with timer.stage("predict_proba"):
+            model.predict_proba(X)
+        for name, value in timer.timings_ms.items():
+            samples[name].append(value)
+
+    for name, values in samples.items():
+        p50, p95, p99 = np.percentile(values, [50, 95, 99])
+        print(f"{name:<15} p50={p50:8.3f} ms  p95={p95:8.3f} ms  p99={p99:8.3f} ms")
+
+if __name__ == "__main__":
+    main()
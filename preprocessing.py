@@ -0,0 +1,238 @@
+"""Prétraitement appris, sérialisable, partagé par toutes les voies de scoring.
+
+Reproduit les étapes de Feze_sn_ML.ipynb appliquées aux caractéristiques :
+imputation moyenne/mode, suppression des doublons, encodage label (genre,
+type_carte) et fréquence (region), écrêtage IQR puis normalisation min-max
+(setup PyCaret, normalize_method="minmax"). Les colonnes sortent dans l'ordre
+attendu par le modèle (model.feature_names_in_).
+
+L'apprentissage suit le notebook jusqu'au découpage : étiquettes manquantes
+complétées par KNN, SMOTE, bornes IQR sur le jeu rééchantillonné, min-max sur
+la partie entraînement. train.py réutilise ces mêmes étapes.
+
+    python preprocessing.py fit     # fraude_bancaire_synthetique_final.csv -> preprocessor.json
+"""
+import argparse
+import json
+import logging
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger("fraude.preprocessing")
+
+PREPROCESSOR_PATH = "preprocessor.json"
+PREPROCESSOR_VERSION = 1
+TARGET_COLUMN = "fraude"
+NUMERIC_COLUMNS = ["age", "salaire", "score_credit", "montant_transaction", "anciennete_compte"]
+LABEL_COLUMNS = ["type_carte", "genre"]
+FREQUENCY_COLUMNS = ["region"]
+INPUT_COLUMNS = NUMERIC_COLUMNS + LABEL_COLUMNS + FREQUENCY_COLUMNS
+# Ordre des colonnes à l'entraînement (model.feature_names_in_)
+FEATURE_ORDER = ["age", "salaire", "score_credit", "montant_transaction", "anciennete_compte",
+                 "type_carte", "region", "genre"]
+# Variantes de saisie rencontrées (formulaire, systèmes amont) -> libellé du dataset
+CATEGORY_ALIASES = {
+    "genre": {"femme": "femelle", "female": "femelle", "f": "femelle", "homme": "male", "m": "male"},
+}
+KNN_NEIGHBORS = 5
+SMOTE_SEED = 42
+SESSION_ID = 123  # setup(session_id=123) du notebook : découpage, plis et forêt
+TRAIN_SIZE = 0.8
+
+class FraudPreprocessor:
+    def __init__(self, fill_values=None, label_classes=None, frequencies=None,
+                 clip_bounds=None, scale_bounds=None, feature_order=FEATURE_ORDER):
+        self.fill_values = fill_values or {}
+        self.label_classes = label_classes or {}
+        self.frequencies = frequencies or {}
+        self.clip_bounds = clip_bounds or {}
+        self.scale_bounds = scale_bounds or {}
+        self.feature_order = list(feature_order)
+
+    @property
+    def is_fitted(self):
+        return bool(self.fill_values)
+
+    # --- Apprentissage ---
+    def fit(self, df):
+        # Mêmes étapes que l'entraînement (df contient TARGET_COLUMN) : voir encode_and_fill, resample_and_split
+        encoded, _ = encode_and_fill(df, preprocessor=self)
+        resample_and_split(encoded["X"], encoded["y"], self)
+        return self
+
+    def fit_encoding(self, df):
+        # Imputation moyenne/mode, doublons, classes et fréquences ; renvoie le jeu nettoyé
+        df = df[INPUT_COLUMNS].copy()
+        for col in NUMERIC_COLUMNS:
+            self.fill_values[col] = float(df[col].mean())
+        for col in LABEL_COLUMNS + FREQUENCY_COLUMNS:
+            self.fill_values[col] = str(df[col].mode()[0])
+        df = df.fillna(self.fill_values).drop_duplicates()
+        # LabelEncoder trie les classes : même ordre ici
+        for col in LABEL_COLUMNS:
+            self.label_classes[col] = sorted(df[col].astype(str).unique().tolist())
+        for col in FREQUENCY_COLUMNS:
+            self.frequencies[col] = {str(k): float(v) for k, v in (df[col].value_counts() / len(df)).items()}
+        return df
+
+    def fit_bounds(self, X, scale=True):
+        # X : matrice encodée (ordre feature_order), éventuellement rééchantillonnée (SMOTE) avant l'écrêtage
+        encoded = {col: X[:, i] for i, col in enumerate(self.feature_order)}
+        for col in NUMERIC_COLUMNS:
+            q1, q3 = np.percentile(encoded[col], [25, 75])
+            iqr = q3 - q1
+            self.clip_bounds[col] = [float(q1 - 1.5 * iqr), float(q3 + 1.5 * iqr)]
+        self.scale_bounds = {}
+        if scale:
+            clipped = self._clip(encoded)
+            for col in self.feature_order:
+                self.scale_bounds[col] = [float(clipped[col].min()), float(clipped[col].max())]
+        return self
+
+    def fit_scale_bounds(self, X):
+        # X : partie entraînement, déjà écrêtée
+        self.scale_bounds = {col: [float(X[:, i].min()), float(X[:, i].max())] for i, col in enumerate(self.feature_order)}
+        return self
+
+    # --- Transformation (vectorisée) ---
+    def _normalize_categories(self, df):
+        out = {}
+        for col in LABEL_COLUMNS + FREQUENCY_COLUMNS:
+            known = self.label_classes.get(col) or list(self.frequencies.get(col, {}))
+            canonical = {k.lower(): k for k in known}
+            canonical.update({alias: target for alias, target in CATEGORY_ALIASES.get(col, {}).items()})
+            raw = df[col]
+            values = raw.astype(str).str.strip().str.lower().map(canonical)
+            unseen = raw.notna() & values.isna()
+            if unseen.any():
+                logger.warning("Colonne '%s' : %d valeur(s) inconnue(s) (%s) remplacée(s) par '%s'",
+                               col, int(unseen.sum()), ", ".join(map(str, raw[unseen].unique()[:5])),
+                               self.fill_values[col])
+            # Valeurs manquantes et catégories inconnues -> mode appris
+            out[col] = values.fillna(self.fill_values[col])
+        return out
+
+    def _encode(self, df):
+        categories = self._normalize_categories(df)
+        encoded = {}
+        for col in NUMERIC_COLUMNS:
+            encoded[col] = pd.to_numeric(df[col], errors="coerce").fillna(self.fill_values[col]).to_numpy(np.float64)
+        for col in LABEL_COLUMNS:
+            codes = {label: float(i) for i, label in enumerate(self.label_classes[col])}
+            encoded[col] = categories[col].map(codes).to_numpy(np.float64)
+        for col in FREQUENCY_COLUMNS:
+            encoded[col] = categories[col].map(self.frequencies[col]).to_numpy(np.float64)
+        return encoded
+
+    def _clip(self, encoded):
+        return {col: np.clip(values, *self.clip_bounds[col]) if col in self.clip_bounds else values
+                for col, values in encoded.items()}
+
+    def encode(self, df):
+        # Encodage seul (ni écrêtage ni normalisation), colonnes dans l'ordre feature_order
+        encoded = self._encode(df)
+        return np.column_stack([encoded[col] for col in self.feature_order])
+
+    def transform(self, df):
+        missing = [col for col in INPUT_COLUMNS if col not in df.columns]
+        if missing:
+            raise ValueError(f"Colonnes manquantes : {', '.join(missing)}")
+        return self.scale(self.clip(self.encode(df)))
+
+    def clip(self, X):
+        encoded = self._clip({col: X[:, i] for i, col in enumerate(self.feature_order)})
+        return np.column_stack([encoded[col] for col in self.feature_order])
+
+    def scale(self, X):
+        if self.scale_bounds:
+            low = np.array([self.scale_bounds[col][0] for col in self.feature_order])
+            high = np.array([self.scale_bounds[col][1] for col in self.feature_order])
+            span = np.where(high > low, high - low, 1.0)
+            X = (X - low) / span
+        return X
+
+    # --- Sérialisation ---
+    def to_dict(self):
+        return {
+            "version": PREPROCESSOR_VERSION,
+            "feature_order": self.feature_order,
+            "fill_values": self.fill_values,
+            "label_classes": self.label_classes,
+            "frequencies": self.frequencies,
+            "clip_bounds": self.clip_bounds,
+            "scale_bounds": self.scale_bounds,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        if data.get("version") != PREPROCESSOR_VERSION:
+            raise ValueError(f"Version de prétraitement non supportée : {data.get('version')}")
+        return cls(
+            fill_values=data["fill_values"],
+            label_classes=data["label_classes"],
+            frequencies=data["frequencies"],
+            clip_bounds=data["clip_bounds"],
+            scale_bounds=data["scale_bounds"],
+            feature_order=data["feature_order"],
+        )
+
+    def save(self, path=PREPROCESSOR_PATH):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path=PREPROCESSOR_PATH):
+        with open(path, encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+# --- Étapes du Notebook (partagées avec train.py) ---
+def encode_and_fill(df, n_jobs=None, preprocessor=None):
+    # Imputation, doublons, encodages (appris pour le service), puis étiquettes manquantes par KNN
+    from sklearn.neighbors import KNeighborsClassifier
+
+    preprocessor = preprocessor if preprocessor is not None else FraudPreprocessor()
+    preprocessor.fit_encoding(df)
+    df = df[INPUT_COLUMNS + [TARGET_COLUMN]].copy()
+    df[INPUT_COLUMNS] = df[INPUT_COLUMNS].fillna(preprocessor.fill_values)
+    df = df.drop_duplicates()
+    X = preprocessor.encode(df)
+    y = df[TARGET_COLUMN].to_numpy(np.float64)
+    unlabeled = np.isnan(y)
+    if unlabeled.any():
+        knn = KNeighborsClassifier(n_neighbors=KNN_NEIGHBORS, n_jobs=n_jobs)
+        knn.fit(X[~unlabeled], y[~unlabeled].astype(np.int64))
+        y[unlabeled] = knn.predict(X[unlabeled])
+    meta = {"preprocessor": preprocessor.to_dict(), "knn_filled": int(unlabeled.sum())}
+    return {"X": X, "y": y.astype(np.int64)}, meta
+
+def resample_and_split(X, y, preprocessor):
+    # SMOTE, bornes IQR sur le jeu rééchantillonné, découpage stratifié, min-max appris sur l'entraînement
+    from imblearn.over_sampling import SMOTE
+    from sklearn.model_selection import train_test_split
+
+    X_res, y_res = SMOTE(random_state=SMOTE_SEED).fit_resample(X, y)
+    preprocessor.fit_bounds(X_res, scale=False)
+    X_train, X_test_encoded, y_train, y_test = train_test_split(X_res, y_res, train_size=TRAIN_SIZE, stratify=y_res,
+                                                                random_state=SESSION_ID)
+    X_train, X_test = preprocessor.clip(X_train), preprocessor.clip(X_test_encoded)
+    preprocessor.fit_scale_bounds(X_train)
+    # X_test_encoded : test encodé mais ni écrêté ni normalisé (réévaluable avec un autre prétraitement, cf. compaction.py)
+    arrays = {"X_train": preprocessor.scale(X_train), "X_test": preprocessor.scale(X_test),
+              "X_test_encoded": X_test_encoded, "y_train": y_train, "y_test": y_test}
+    return arrays, {"preprocessor": preprocessor.to_dict(), "resampled": int(len(y_res))}
+
+def main():
+    parser = argparse.ArgumentParser(description="Apprentissage du prétraitement")
+    sub = parser.add_subparsers(dest="command", required=True)
+    fit_parser = sub.add_parser("fit", help="Apprend le prétraitement sur un CSV et l'enregistre")
+    fit_parser.add_argument("--data", default="fraude_bancaire_synthetique_final.csv")
+    fit_parser.add_argument("--out", default=PREPROCESSOR_PATH)
+    args = parser.parse_args()
+
+    preprocessor = FraudPreprocessor().fit(pd.read_csv(args.data))
+    preprocessor.save(args.out)
+    print(f"Prétraitement enregistré dans '{args.out}'")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+"""Rapports PDF de prédiction (ReportLab).
+
+Les styles et le gabarit de tableau sont construits une seule fois au niveau du
+module. ReportService génère les rapports dans un pool de threads, à la
+demande, et mémorise le résultat par prédiction. Le mode lot produit un PDF
+multi-pages ou une archive ZIP d'un rapport par transaction.
+
+    python reports.py bulk resultats_lot.csv --format zip --out rapports.zip
+"""
+import argparse
+import hashlib
+import json
+import math
+import threading
+import time
+import zipfile
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.lib.units import inch
+from reportlab.platypus import PageBreak, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+from preprocessing import CATEGORY_ALIASES
+
+# --- Styles Partagés (construits une fois) ---
+STYLES = getSampleStyleSheet()
+INPUT_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0,0), (-1,0), colors.HexColor('#e0e7ff')),
+    ('TEXTCOLOR', (0,0), (-1,0), colors.HexColor('#007bff')),
+    ('ALIGN', (0,0), (-1,-1), 'LEFT'),
+    ('FONTNAME', (0,0), (-1,0), 'Helvetica-Bold'),
+    ('BOTTOMPADDING', (0,0), (-1,0), 12),
+    ('BACKGROUND', (0,1), (-1,-1), colors.HexColor('#f7faff')),
+    ('GRID', (0,0), (-1,-1), 1, colors.HexColor('#cccccc')),
+    ('BOX', (0,0), (-1,-1), 1, colors.HexColor('#cccccc')),
+    ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
+    ('TOPPADDING', (0,0), (-1,-1), 8),
+    ('BOTTOMPADDING', (0,0), (-1,-1), 8),
+])
+INPUT_TABLE_COL_WIDTHS = [2.5*inch, 3.5*inch]
+FACTORS_TABLE_COL_WIDTHS = [2.2*inch, 2.3*inch, 1.5*inch]
+RESULT_KEYS = ("Prédiction", "Confiance")
+FACTORS_KEY = "Facteurs"  # [[variable, valeur saisie, contribution]], voir explain.format_factors
+BULK_REPORT_MAX_ROWS = 5_000
+GENRE_LABELS = {"male": "Male", "femelle": "Femme"}  # Libellés du formulaire de prédiction
+MISSING_VALUE = "—"
+
+# --- Construction du Rapport ---
+def _report_story(prediction_data, report_date):
+    story = []
+    story.append(Paragraph("<b><font size='20' color='#007bff'>Rapport de Prédiction de Fraude</font></b>", STYLES['h1']))
+    story.append(Spacer(1, 0.3*inch))
+    story.append(Paragraph(f"Date du rapport : <b>{report_date}</b>", STYLES['Normal']))
+    story.append(Spacer(1, 0.2*inch))
+
+    story.append(Paragraph("<h2><font color='#4CAF50'>Informations Saisies :</font></h2>", STYLES['h2']))
+    input_data_table_data = [[
+        Paragraph("<b>Caractéristique</b>", STYLES['Normal']),
+        Paragraph("<b>Valeur</b>", STYLES['Normal'])
+    ]]
+    for key, value in prediction_data.items():
+        if key not in RESULT_KEYS and key != FACTORS_KEY:
+            input_data_table_data.append([Paragraph(f"<b>{key}</b>", STYLES['Normal']), Paragraph(str(value), STYLES['Normal'])])
+    input_table = Table(input_data_table_data, colWidths=INPUT_TABLE_COL_WIDTHS)
+    input_table.setStyle(INPUT_TABLE_STYLE)
+    story.append(input_table)
+    story.append(Spacer(1, 0.3*inch))
+
+    story.append(Paragraph("<h2><font color='#F44336'>Résultat de la Prédiction :</font></h2>", STYLES['h2']))
+    result_color = '#F44336' if prediction_data['Prédiction'] == 'Fraude' else '#4CAF50'
+    story.append(Paragraph(f"<b>Prédiction :</b> <font color='{result_color}'>{prediction_data['Prédiction']}</font>", STYLES['h3']))
+    story.append(Paragraph(f"<b>Confiance du Modèle :</b> {prediction_data['Confiance']}", STYLES['h3']))
+
+    factors = prediction_data.get(FACTORS_KEY)
+    if factors:
+        story.append(Spacer(1, 0.2*inch))
+        story.append(Paragraph("<h2><font color='#007bff'>Principaux Facteurs de la Décision :</font></h2>", STYLES['h2']))
+        factors_table_data = [[Paragraph(f"<b>{title}</b>", STYLES['Normal']) for title in ("Caractéristique", "Valeur", "Contribution")]]
+        for label, value, points in factors:
+            color = '#F44336' if points.startswith('+') else '#4CAF50'
+            factors_table_data.append([Paragraph(f"<b>{label}</b>", STYLES['Normal']), Paragraph(str(value), STYLES['Normal']),
+                                       Paragraph(f"<font color='{color}'>{points}</font>", STYLES['Normal'])])
+        factors_table = Table(factors_table_data, colWidths=FACTORS_TABLE_COL_WIDTHS)
+        factors_table.setStyle(INPUT_TABLE_STYLE)
+        story.append(factors_table)
+        story.append(Paragraph("Contribution de chaque caractéristique à la probabilité de fraude, en points de pourcentage.", STYLES['Italic']))
+    story.append(Spacer(1, 0.5*inch))
+    return story
+
+def _build_pdf(story):
+    buffer = BytesIO()
+    SimpleDocTemplate(buffer, pagesize=letter).build(story)
+    return buffer.getvalue()
+
+def create_pdf_report(prediction_data):
+    buffer = BytesIO(_build_pdf(_report_story(prediction_data, time.strftime('%Y-%m-%d %H:%M:%S'))))
+    return buffer
+
+def create_bulk_pdf(predictions):
+    # Un seul document, une page par transaction
+    report_date = time.strftime('%Y-%m-%d %H:%M:%S')
+    story = []
+    for i, prediction_data in enumerate(predictions):
+        if i:
+            story.append(PageBreak())
+        story.extend(_report_story(prediction_data, report_date))
+    return _build_pdf(story)
+
+def create_bulk_zip(predictions):
+    report_date = time.strftime('%Y-%m-%d %H:%M:%S')
+    buffer = BytesIO()
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for i, prediction_data in enumerate(predictions, start=1):
+            archive.writestr(f"rapport_transaction_{i:06d}.pdf", _build_pdf(_report_story(prediction_data, report_date)))
+    return buffer.getvalue()
+
+# --- Lignes Scorées -> Données de Rapport ---
+def _is_missing(value):
+    return value is None or (isinstance(value, float) and math.isnan(value)) or (isinstance(value, str) and not value.strip())
+
+def _display_text(value):
+    return MISSING_VALUE if _is_missing(value) else str(value)
+
+def _display_number(value, fmt):
+    # Valeur vide -> "—" ; valeur non numérique affichée telle quelle (elle a été imputée au scoring)
+    if _is_missing(value):
+        return MISSING_VALUE
+    try:
+        return fmt.format(float(value)).replace(",", " ")
+    except (TypeError, ValueError):
+        return str(value)
+
+def _display_genre(value):
+    if _is_missing(value):
+        return MISSING_VALUE
+    key = str(value).strip().lower()
+    return GENRE_LABELS.get(CATEGORY_ALIASES["genre"].get(key, key), str(value))
+
+def prediction_data_from_row(row):
+    # Même présentation que la page de prédiction, à partir d'une ligne de scoring.score_frame
+    proba_fraude = float(row["proba_fraude"])
+    confidence = max(proba_fraude, 1.0 - proba_fraude) * 100
+    return {
+        "Âge": _display_number(row["age"], "{:.0f}"),
+        "Genre": _display_genre(row["genre"]),
+        "Région": _display_text(row["region"]),
+        "Salaire": _display_number(row["salaire"], "{:,.2f} €"),
+        "Type de Carte": _display_text(row["type_carte"]),
+        "Score de Crédit": _display_number(row["score_credit"], "{:.1f}"),
+        "Montant Transaction": _display_number(row["montant_transaction"], "{:,.2f} €"),
+        "Ancienneté du Compte": _display_number(row["anciennete_compte"], "{:.1f} années"),
+        "Prédiction": row["prediction"],
+        "Confiance": f"{confidence:.2f}%",
+    }
+
+def predictions_from_frame(scored_df, frauds_only=True, max_rows=BULK_REPORT_MAX_ROWS, model=None):
+    if frauds_only:
+        scored_df = scored_df[scored_df["prediction"] == "Fraude"]
+    scored_df = scored_df.head(max_rows)
+    predictions = [prediction_data_from_row(row) for row in scored_df.to_dict("records")]
+    if model is not None and predictions:
+        # Facteurs explicatifs de toutes les lignes en un seul appel vectorisé
+        from explain import FEATURE_LABELS, explanation_rows, format_factors
+        from scoring import encode_transactions
+        for prediction_data, explanation in zip(predictions, explanation_rows(model, encode_transactions(scored_df))):
+            raw_values = {name: prediction_data.get(label, "") for name, label in FEATURE_LABELS.items()}
+            prediction_data[FACTORS_KEY] = format_factors(explanation["facteurs"], raw_values)
+    return predictions
+
+# --- Génération Asynchrone et Mémorisée ---
+def stream_content_hash(stream):
+    # Empreinte du contenu d'un fichier importé (même calcul que dashboard_aggregates.file_content_hash)
+    position = stream.tell()
+    stream.seek(0)
+    digest = hashlib.blake2b(digest_size=16)
+    for block in iter(lambda: stream.read(1 << 22), b""):
+        digest.update(block)
+    stream.seek(position)
+    return digest.hexdigest()
+
+def report_key(*parts):
+    payload = json.dumps(parts, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class ReportService:
+    def __init__(self, max_workers=2, max_entries=256):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="pdf-report")
+        self._futures = OrderedDict()
+        self._lock = threading.Lock()
+        self.max_entries = max_entries
+
+    def get(self, key):
+        # Une génération en échec est oubliée : l'utilisateur peut la relancer
+        with self._lock:
+            future = self._futures.get(key)
+            if future is not None and future.done() and future.exception() is not None:
+                del self._futures[key]
+                return None
+            if future is not None:
+                self._futures.move_to_end(key)
+            return future
+
+    def submit(self, key, fn, *args):
+        # Une seule génération par clé, même si plusieurs sessions la demandent en même temps
+        with self._lock:
+            future = self._futures.get(key)
+            if future is None or (future.done() and future.exception() is not None):
+                future = self._executor.submit(fn, *args)
+                self._futures[key] = future
+            self._futures.move_to_end(key)
+            while len(self._futures) > self.max_entries:
+                self._futures.popitem(last=False)
+            return future
+
+    def report(self, key, prediction_data):
+        return self.submit(key, lambda data: create_pdf_report(data).getvalue(), prediction_data)
+
+    def bulk(self, key, predictions, output_format="pdf"):
+        builder = create_bulk_zip if output_format == "zip" else create_bulk_pdf
+        return self.submit(key, builder, predictions)
+
+    def bulk_from_frame(self, key, scored_df, output_format="pdf", model=None):
+        # Données de rapport et facteurs explicatifs calculés dans le pool, seulement à la demande
+        builder = create_bulk_zip if output_format == "zip" else create_bulk_pdf
+        return self.submit(key, lambda df: builder(predictions_from_frame(df, model=model)), scored_df)
+
+def main():
+    import pandas as pd
+
+    parser = argparse.ArgumentParser(description="Rapports PDF en lot à partir d'un fichier scoré")
+    sub = parser.add_subparsers(dest="command", required=True)
+    bulk_parser = sub.add_parser("bulk", help="PDF multi-pages ou ZIP d'un fichier de résultats")
+    bulk_parser.add_argument("input", help="CSV produit par l'analyse par lot (colonnes proba_fraude, prediction)")
+    bulk_parser.add_argument("--format", choices=["pdf", "zip"], default="pdf")
+    bulk_parser.add_argument("--all", action="store_true", help="Toutes les transactions, pas seulement les fraudes")
+    bulk_parser.add_argument("--max-rows", type=int, default=BULK_REPORT_MAX_ROWS)
+    bulk_parser.add_argument("--no-factors", action="store_true", help="Sans les facteurs explicatifs")
+    bulk_parser.add_argument("--out", required=True)
+    args = parser.parse_args()
+
+    model = None
+    if not args.no_factors:
+        from scoring import load_model
+        model = load_model()
+    predictions = predictions_from_frame(pd.read_csv(args.input), frauds_only=not args.all, max_rows=args.max_rows,
+                                         model=model)
+    start = time.perf_counter()
+    data = create_bulk_zip(predictions) if args.format == "zip" else create_bulk_pdf(predictions)
+    with open(args.out, "wb") as f:
+        f.write(data)
+    print(f"{len(predictions)} rapport(s) écrit(s) dans '{args.out}' en {time.perf_counter() - start:.2f} s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""Module de scoring indépendant de Streamlit.
+
+Contient l'encodage des transactions et l'appel au modèle, partagés par
+l'application (main.py), l'API HTTP (api.py) et les traitements par lot.
+N'importe ni streamlit, ni plotly, ni reportlab pour garder un démarrage léger.
+"""
+import logging
+import os
+import pickle
+import threading
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+import model_bundle
+from preprocessing import PREPROCESSOR_PATH, FraudPreprocessor
+
+logger = logging.getLogger("fraude.scoring")
+
+MODEL_PATH = "model.pkl"
+BUNDLE_PATH = model_bundle.BUNDLE_PATH
+# "auto"    : bundle mmap s'il existe et correspond à model.pkl, quelle que soit la taille des lots ;
+#             pickle seulement si le bundle est absent ou obsolète (python model_bundle.py export)
+# "bundle"  : bundle mmap uniquement
+# "flat"    : model.pkl converti en forest_engine.FlatForest
+# "sklearn" : model.pkl tel quel (predict_proba de scikit-learn)
+INFERENCE_BACKEND = os.environ.get("FRAUDE_INFERENCE_BACKEND", "auto")
+INFERENCE_BACKENDS = ("auto", "bundle", "flat", "sklearn")
+BATCH_CHUNK_SIZE = 10_000  # Lignes par appel à predict_proba
+
+# --- Chargement du Modèle (une seule fois par processus) ---
+_models = {}
+_models_lock = threading.Lock()
+
+def _load_pickle(path):
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+def _load_model_uncached(path, backend):
+    if backend == "bundle":
+        return model_bundle.load_bundle(BUNDLE_PATH)
+    if backend == "auto":
+        if model_bundle.bundle_exists(BUNDLE_PATH):
+            if model_bundle.bundle_matches_source(BUNDLE_PATH, path):
+                return model_bundle.load_bundle(BUNDLE_PATH)
+            logger.warning("Bundle '%s' obsolète par rapport à '%s' : chargement via pickle", BUNDLE_PATH, path)
+        return _load_pickle(path)
+    model = _load_pickle(path)
+    if backend == "flat":
+        from forest_engine import FlatForest
+        model = FlatForest.from_sklearn(model)
+    return model
+
+@lru_cache(maxsize=8)
+def _file_digest(path, size, mtime_ns):
+    return model_bundle.file_sha256(path)[:16]
+
+@lru_cache(maxsize=8)
+def _manifest_info(manifest_path, size, mtime_ns):
+    # (variante, sha256 de la source, empreinte du manifeste) ; relu seulement si le manifeste change
+    manifest = model_bundle.read_manifest(os.path.dirname(manifest_path))
+    source = manifest.get("source") or {}
+    return manifest.get("variant"), source.get("sha256"), model_bundle.file_sha256(manifest_path)[:8]
+
+def _bundle_info(bundle_path=BUNDLE_PATH):
+    manifest_path = os.path.abspath(os.path.join(bundle_path, model_bundle.MANIFEST_NAME))
+    try:
+        stat = os.stat(manifest_path)
+    except FileNotFoundError:
+        return None
+    return _manifest_info(manifest_path, stat.st_size, stat.st_mtime_ns)
+
+def model_version(path=MODEL_PATH, backend=None):
+    # Empreinte du modèle réellement servi : contenu de model.pkl (re-haché seulement si taille ou date
+    # changent), suivi de la variante et de l'empreinte du manifeste quand un bundle compact est servi
+    backend = backend or INFERENCE_BACKEND
+    bundle = _bundle_info() if backend in ("auto", "bundle") else None
+    if backend == "bundle":
+        if bundle is None:
+            raise FileNotFoundError(f"Bundle '{BUNDLE_PATH}' introuvable")
+        variant, source_sha, manifest_digest = bundle
+        return f"{(source_sha or 'bundle')[:16]}+{variant or 'complet'}-{manifest_digest}"
+    stat = os.stat(path)
+    version = _file_digest(os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    if bundle is not None:
+        variant, source_sha, manifest_digest = bundle
+        # "auto" ne sert la variante que si le bundle provient de ce model.pkl
+        if variant and source_sha and source_sha[:16] == version:
+            version = f"{version}+{variant}-{manifest_digest}"
+    return version
+
+def load_model(path=MODEL_PATH, backend=None):
+    backend = backend or INFERENCE_BACKEND
+    if backend not in INFERENCE_BACKENDS:
+        raise ValueError(f"Backend d'inférence inconnu : {backend}")
+    version = model_version(path, backend)
+    with _models_lock:
+        cached = _models.get((path, backend))
+        if cached is None or cached[0] != version:
+            if cached is not None:
+                logger.info("Modèle '%s' modifié sur disque (%s) : rechargement", path, version)
+            _models[(path, backend)] = (version, _load_model_uncached(path, backend))
+        return _models[(path, backend)][1]
+
+# --- Encodage des Caractéristiques ---
+_preprocessors = {}
+
+def load_preprocessor(path=PREPROCESSOR_PATH):
+    with _models_lock:
+        if path not in _preprocessors:
+            _preprocessors[path] = FraudPreprocessor.load(path)
+        return _preprocessors[path]
+
+def encode_transactions(df, preprocessor=None):
+    # Prétraitement appris (preprocessor.json), identique pour le formulaire, l'API et les lots
+    preprocessor = preprocessor if preprocessor is not None else load_preprocessor()
+    return preprocessor.transform(df)
+
+# --- Scoring ---
+def predict_encoded(X, model=None):
+    # Retourne (classe prédite, probabilité de fraude) pour une matrice déjà encodée
+    model = model if model is not None else load_model()
+    prediction_proba = model.predict_proba(X)
+    return np.argmax(prediction_proba, axis=1), prediction_proba[:, 1]
+
+def score_frame(df, model=None, return_encoded=False):
+    # return_encoded : renvoie aussi la matrice encodée (journal d'audit, explications)
+    X = encode_transactions(df)
+    prediction_class, proba_fraude = predict_encoded(X, model)
+    result = df.copy()
+    result["proba_fraude"] = proba_fraude
+    result["prediction"] = np.where(prediction_class == 1, "Fraude", "Non Fraude")
+    return (result, X) if return_encoded else result
+
+def score(records, model=None):
+    # records : liste de dictionnaires au format du dataset
+    if not records:
+        return []
+    df = pd.DataFrame.from_records(records)
+    prediction_class, proba_fraude = predict_encoded(encode_transactions(df), model)
+    return [
+        {"proba_fraude": float(p), "fraude": int(c), "prediction": "Fraude" if c == 1 else "Non Fraude"}
+        for c, p in zip(prediction_class, proba_fraude)
+    ]
+
+# --- Lecture de Fichiers par Morceaux ---
+def _is_parquet(source):
+    return str(getattr(source, "name", source)).lower().endswith(".parquet")
+
+def iter_file_chunks(source, chunk_size=BATCH_CHUNK_SIZE):
+    # Lecture par morceaux pour ne jamais charger tout le fichier en mémoire
+    if _is_parquet(source):
+        import pyarrow.parquet as pq
+        parquet_file = pq.ParquetFile(source)
+        for record_batch in parquet_file.iter_batches(batch_size=chunk_size):
+            yield record_batch.to_pandas()
+    else:
+        yield from pd.read_csv(source, chunksize=chunk_size)
+
+def count_file_rows(source):
+    # Nombre de lignes pour la barre de progression (sans parser les valeurs)
+    if _is_parquet(source):
+        import pyarrow.parquet as pq
+        total = pq.ParquetFile(source).metadata.num_rows
+    elif isinstance(source, str):
+        with open(source, "rb") as f:
+            total = max(sum(1 for _ in f) - 1, 0)
+    else:
+        total = max(sum(1 for _ in source) - 1, 0)
+    if hasattr(source, "seek"):
+        source.seek(0)
+    return total
@@ -0,0 +1,397 @@
+"""Worker de scoring continu d'un flux de transactions, par micro-lots.
+
+Un thread lit la source (JSONL sur stdin, fichier suivi comme `tail -f`, ou
+répertoire de dépôt) et remplit une file bornée : quand le scoring ne suit
+plus, la lecture se bloque (contre-pression) au lieu de faire grossir la
+mémoire. Le thread principal forme des lots bornés en taille et en attente,
+les score avec le modèle et le prétraitement de l'application (scoring.score),
+écrit une alerte JSON par fraude et journalise les métriques de chaque lot.
+Les transactions incomplètes (colonnes manquantes) et les lots en échec sont
+écartés vers le fichier de rejets (--rejects) sans arrêter le worker.
+
+    python stream_worker.py simulate --out .cache/flux.jsonl --rate 200 &
+    python stream_worker.py tail .cache/flux.jsonl --alerts alertes.jsonl
+    cat transactions.jsonl | python stream_worker.py stdin
+    python stream_worker.py watch depot/ --rejects rejets.jsonl   # fichiers .jsonl / .csv déposés ; illisibles -> depot/rejetes/
+"""
+import argparse
+import glob
+import json
+import logging
+import os
+import queue
+import signal
+import sys
+import threading
+import time
+from functools import partial
+
+from perf import log_event
+from preprocessing import INPUT_COLUMNS
+from scoring import MODEL_PATH, load_model, score
+
+logger = logging.getLogger("fraude.stream")
+
+MAX_BATCH = 256
+MAX_LATENCY_MS = 50.0
+QUEUE_SIZE = 10_000
+POLL_INTERVAL = 0.2
+ALERT_THRESHOLD = 0.5
+_END = object()
+
+# --- Sources ---
+# Chaque source produit des couples (transaction, référence) ; la référence sert à tracer les alertes.
+# Une source peut aussi produire (action, référence) : l'action est exécutée une fois scorées toutes
+# les transactions produites avant elle.
+def _parse_line(line, ref):
+    line = line.strip()
+    if not line:
+        return None
+    try:
+        record = json.loads(line)
+    except json.JSONDecodeError:
+        logger.warning("Ligne JSON invalide ignorée (%s)", ref)
+        return None
+    if not isinstance(record, dict):
+        logger.warning("Transaction non objet ignorée (%s)", ref)
+        return None
+    return record
+
+def stdin_source(stream=None, stop_event=None):
+    stream = stream or sys.stdin
+    for line_no, line in enumerate(stream, start=1):
+        if stop_event is not None and stop_event.is_set():
+            return
+        record = _parse_line(line, f"stdin:{line_no}")
+        if record is not None:
+            yield record, f"stdin:{line_no}"
+
+def tail_source(path, stop_event, from_start=False, poll_interval=POLL_INTERVAL):
+    # Suit le fichier comme `tail -F` : lignes partielles mises de côté, troncature/rotation détectées
+    f, line_no, pending = None, 0, ""
+    while not stop_event.is_set():
+        if f is None:
+            try:
+                f = open(path, encoding="utf-8")
+            except FileNotFoundError:
+                time.sleep(poll_interval)
+                continue
+            if not from_start:
+                f.seek(0, os.SEEK_END)
+            from_start = True  # Après une rotation, le nouveau fichier est lu depuis le début
+        chunk = f.readline()
+        if chunk:
+            pending += chunk
+            if pending.endswith("\n"):
+                line_no += 1
+                record = _parse_line(pending, f"{path}:{line_no}")
+                pending = ""
+                if record is not None:
+                    yield record, f"{path}:{line_no}"
+            continue
+        try:
+            rotated = os.stat(path).st_ino != os.fstat(f.fileno()).st_ino or os.path.getsize(path) < f.tell()
+        except FileNotFoundError:
+            rotated = False
+        if rotated:
+            logger.info("'%s' tronqué ou remplacé : reprise au début", path)
+            f.close()
+            f, line_no, pending = None, 0, ""
+            continue
+        time.sleep(poll_interval)
+    if f is not None:
+        f.close()
+
+def _read_drop_file(path):
+    if path.lower().endswith(".csv"):
+        import pandas as pd
+        df = pd.read_csv(path)
+        df = df.astype(object).where(df.notna(), None)  # NaN -> null dans les alertes JSON
+        for i, record in enumerate(df.to_dict("records"), start=1):
+            yield record, f"{path}:{i}"
+        return
+    with open(path, encoding="utf-8") as f:
+        for line_no, line in enumerate(f, start=1):
+            record = _parse_line(line, f"{path}:{line_no}")
+            if record is not None:
+                yield record, f"{path}:{line_no}"
+
+def _mark_done(path, done_dir, in_progress):
+    os.replace(path, os.path.join(done_dir, os.path.basename(path)))
+    in_progress.discard(path)
+
+def _reject_drop_file(path, rejected_dir, in_progress, error, on_file_error=None):
+    logger.error("Fichier illisible '%s' (%s: %s) : déplacé dans %s", path, type(error).__name__, error, rejected_dir)
+    try:
+        os.replace(path, os.path.join(rejected_dir, os.path.basename(path)))
+        in_progress.discard(path)
+    except OSError:
+        # Reste marqué en cours : ignoré jusqu'au redémarrage plutôt que relu en boucle
+        logger.exception("Impossible de déplacer '%s'", path)
+    if on_file_error is not None:
+        on_file_error(path, error)
+
+def drop_dir_source(directory, stop_event, once=False, poll_interval=POLL_INTERVAL, on_file_error=None):
+    # Les producteurs écrivent sous un autre nom puis renomment en .jsonl/.csv : un fichier visible est complet.
+    # Un fichier n'est déplacé dans traites/ qu'une fois toutes ses transactions scorées (arrêt = fichier relu) ;
+    # un fichier illisible (CSV mal formé, encodage...) part dans rejetes/ sans arrêter la lecture des autres
+    done_dir = os.path.join(directory, "traites")
+    rejected_dir = os.path.join(directory, "rejetes")
+    os.makedirs(done_dir, exist_ok=True)
+    os.makedirs(rejected_dir, exist_ok=True)
+    in_progress = set()
+    while not stop_event.is_set():
+        paths = sorted(p for pattern in ("*.jsonl", "*.csv") for p in glob.glob(os.path.join(directory, pattern))
+                       if p not in in_progress)
+        for path in paths:
+            in_progress.add(path)
+            try:
+                yield from _read_drop_file(path)
+            except Exception as e:
+                _reject_drop_file(path, rejected_dir, in_progress, e, on_file_error)
+                continue
+            yield partial(_mark_done, path, done_dir, in_progress), path
+        if once and not paths:
+            return
+        if not paths:
+            time.sleep(poll_interval)
+
+def missing_columns(record):
+    # Colonnes absentes de la transaction (une valeur nulle est imputée, une colonne absente est rejetée)
+    return [col for col in INPUT_COLUMNS if col not in record]
+
+# --- Worker ---
+class StreamWorker:
+    def __init__(self, model=None, max_batch=MAX_BATCH, max_latency_ms=MAX_LATENCY_MS, queue_size=QUEUE_SIZE,
+                 alert_threshold=ALERT_THRESHOLD, alert_sink=None, reject_sink=None):
+        self.model = model if model is not None else load_model(MODEL_PATH)
+        self.max_batch = max_batch
+        self.max_latency_ms = max_latency_ms
+        self.alert_threshold = alert_threshold
+        self.alert_sink = alert_sink or sys.stdout
+        self.reject_sink = reject_sink
+        self._reject_lock = threading.Lock()
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.stop_event = threading.Event()
+        self.scored = 0
+        self.alerts = 0
+        self.rejected = 0
+        self.rejected_files = 0
+        self.failed_batches = 0
+        self.batches = 0
+        self.blocked_puts = 0
+        self._source_error = None
+
+    def _read(self, source):
+        try:
+            for record, ref in source:
+                if not callable(record):
+                    missing = missing_columns(record)
+                    if missing:
+                        self._reject(record, ref, f"Colonnes manquantes : {', '.join(missing)}")
+                        continue
+                item = (record, ref, time.perf_counter())
+                try:
+                    self.queue.put_nowait(item)
+                except queue.Full:
+                    # Contre-pression : la lecture attend que le scoring libère de la place
+                    self.blocked_puts += 1
+                    while not self.stop_event.is_set():
+                        try:
+                            self.queue.put(item, timeout=POLL_INTERVAL)
+                            break
+                        except queue.Full:
+                            continue
+                if self.stop_event.is_set():
+                    break
+        except Exception as e:
+            self._source_error = e
+            logger.exception("Erreur de lecture de la source")
+        finally:
+            self.queue.put(_END)
+
+    def _collect(self):
+        # Premier élément bloquant, puis jusqu'à max_batch éléments ou max_latency_ms écoulées
+        while True:
+            try:
+                first = self.queue.get(timeout=POLL_INTERVAL)
+                break
+            except queue.Empty:
+                # Arrêt demandé et file vide : la source peut rester bloquée en lecture (stdin), on n'attend pas
+                if self.stop_event.is_set():
+                    return None, True
+        if first is _END:
+            return None, True
+        batch = [first]
+        deadline = time.perf_counter() + self.max_latency_ms / 1000
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            try:
+                item = self.queue.get(timeout=remaining) if remaining > 0 else self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _END:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _emit_alert(self, record, ref, result):
+        alert = {"ts": time.time(), "source": ref, "proba_fraude": round(result["proba_fraude"], 6),
+                 "transaction": record}
+        self.alert_sink.write(json.dumps(alert, default=str, ensure_ascii=False) + "\n")
+        self.alert_sink.flush()
+        self.alerts += 1
+
+    def _reject(self, record, ref, error):
+        # Appelé par le thread de lecture (validation) et par le thread principal (lot en échec)
+        with self._reject_lock:
+            self.rejected += 1
+            if self.reject_sink is None:
+                logger.warning("Transaction rejetée (%s) : %s", ref, error)
+                return
+            reject = {"ts": time.time(), "source": ref, "error": error, "transaction": record}
+            self.reject_sink.write(json.dumps(reject, default=str, ensure_ascii=False) + "\n")
+            self.reject_sink.flush()
+
+    def reject_file(self, path, error):
+        # Fichier source entier écarté (voir drop_dir_source) ; appelé par le thread de lecture
+        with self._reject_lock:
+            self.rejected_files += 1
+            if self.reject_sink is not None:
+                reject = {"ts": time.time(), "source": path, "error": f"{type(error).__name__}: {error}", "transaction": None}
+                self.reject_sink.write(json.dumps(reject, default=str, ensure_ascii=False) + "\n")
+                self.reject_sink.flush()
+
+    def _process(self, batch):
+        items = [item for item in batch if not callable(item[0])]
+        actions = [item for item in batch if callable(item[0])]
+        if items:
+            self._score_batch(items)
+        for action, ref, _ in actions:
+            try:
+                action()
+            except OSError:
+                logger.exception("Action de fin de source en échec (%s)", ref)
+
+    def _score_batch(self, batch):
+        start = time.perf_counter()
+        try:
+            results = score([record for record, _, _ in batch], self.model)
+        except Exception as e:
+            # Un lot en échec est écarté en entier ; le worker continue avec les suivants
+            logger.exception("Échec du scoring d'un lot de %d transactions", len(batch))
+            self.failed_batches += 1
+            for record, ref, _ in batch:
+                self._reject(record, ref, f"{type(e).__name__}: {e}")
+            return
+        score_ms = (time.perf_counter() - start) * 1000
+        batch_alerts = 0
+        for (record, ref, _), result in zip(batch, results):
+            if result["proba_fraude"] > self.alert_threshold:
+                self._emit_alert(record, ref, result)
+                batch_alerts += 1
+        self.scored += len(batch)
+        self.batches += 1
+        log_event("stream_batch", batch_size=len(batch), queue_depth=self.queue.qsize(),
+                  max_wait_ms=round((start - batch[0][2]) * 1000, 3), score_ms=round(score_ms, 3),
+                  rows_per_s=round(len(batch) / (score_ms / 1000), 1) if score_ms else None,
+                  alerts=batch_alerts, total_scored=self.scored, total_alerts=self.alerts,
+                  total_rejected=self.rejected, blocked_puts=self.blocked_puts)
+
+    def run(self, source):
+        reader = threading.Thread(target=self._read, args=(source,), name="stream-reader", daemon=True)
+        reader.start()
+        start = time.perf_counter()
+        finished = False
+        while not finished:
+            batch, finished = self._collect()
+            if batch:
+                self._process(batch)
+        reader.join(timeout=1.0)
+        elapsed = time.perf_counter() - start
+        log_event("stream_end", scored=self.scored, alerts=self.alerts, rejected=self.rejected,
+                  rejected_files=self.rejected_files, batches=self.batches, failed_batches=self.failed_batches,
+                  seconds=round(elapsed, 3), blocked_puts=self.blocked_puts)
+        if self._source_error is not None:
+            raise self._source_error
+        return {"scored": self.scored, "alerts": self.alerts, "rejected": self.rejected,
+                "rejected_files": self.rejected_files, "batches": self.batches, "seconds": elapsed}
+
+    def stop(self, *_):
+        # SIGINT/SIGTERM : la source s'arrête, les éléments déjà en file sont scorés
+        self.stop_event.set()
+
+# --- Flux Simulé (remplaçant hors ligne du flux réel) ---
+def simulate_feed(out_path, data_path, rate, limit=None, seed=0):
+    import pandas as pd
+
+    records = pd.read_csv(data_path).sample(frac=1.0, random_state=seed).drop(columns=["fraude"], errors="ignore")
+    records = records.astype(object).where(records.notna(), None).to_dict("records")
+    interval = 1.0 / rate if rate > 0 else 0.0
+    written = 0
+    with open(out_path, "a", encoding="utf-8") as f:
+        while limit is None or written < limit:
+            record = dict(records[written % len(records)], transaction_id=f"sim-{written:09d}")
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            f.flush()
+            written += 1
+            if interval:
+                time.sleep(interval)
+    return written
+
+def main():
+    parser = argparse.ArgumentParser(description="Scoring continu d'un flux de transactions par micro-lots")
+    sub = parser.add_subparsers(dest="command", required=True)
+    stdin_parser = sub.add_parser("stdin", help="Transactions JSONL lues sur l'entrée standard")
+    tail_parser = sub.add_parser("tail", help="Fichier JSONL suivi en continu")
+    tail_parser.add_argument("path")
+    tail_parser.add_argument("--from-start", action="store_true", help="Lire aussi les lignes déjà présentes")
+    watch_parser = sub.add_parser("watch", help="Répertoire de dépôt de fichiers .jsonl / .csv")
+    watch_parser.add_argument("directory")
+    watch_parser.add_argument("--once", action="store_true", help="S'arrêter quand le répertoire est vide")
+    for p in (stdin_parser, tail_parser, watch_parser):
+        p.add_argument("--model", default=MODEL_PATH)
+        p.add_argument("--max-batch", type=int, default=MAX_BATCH)
+        p.add_argument("--max-latency-ms", type=float, default=MAX_LATENCY_MS)
+        p.add_argument("--queue-size", type=int, default=QUEUE_SIZE)
+        p.add_argument("--threshold", type=float, default=ALERT_THRESHOLD, help="Probabilité au-delà de laquelle une alerte est émise")
+        p.add_argument("--alerts", default=None, help="Fichier JSONL des alertes (défaut : stdout)")
+        p.add_argument("--rejects", default=None, help="Fichier JSONL des transactions rejetées (défaut : journal)")
+    simulate_parser = sub.add_parser("simulate", help="Écrit un flux JSONL simulé à partir du dataset")
+    simulate_parser.add_argument("--out", required=True)
+    simulate_parser.add_argument("--data", default="fraude_bancaire_synthetique_final.csv")
+    simulate_parser.add_argument("--rate", type=float, default=100.0, help="Transactions par seconde (0 = sans limite)")
+    simulate_parser.add_argument("--limit", type=int, default=None)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, stream=sys.stderr,
+                        format="%(asctime)s %(name)s %(levelname)s %(message)s")
+    if args.command == "simulate":
+        written = simulate_feed(args.out, args.data, args.rate, args.limit)
+        print(f"{written} transactions écrites dans '{args.out}'", file=sys.stderr)
+        return
+
+    alert_sink = open(args.alerts, "a", encoding="utf-8") if args.alerts else None
+    reject_sink = open(args.rejects, "a", encoding="utf-8") if args.rejects else None
+    try:
+        worker = StreamWorker(load_model(args.model), args.max_batch, args.max_latency_ms, args.queue_size,
+                              args.threshold, alert_sink, reject_sink)
+        signal.signal(signal.SIGINT, worker.stop)
+        signal.signal(signal.SIGTERM, worker.stop)
+        if args.command == "stdin":
+            source = stdin_source(stop_event=worker.stop_event)
+        elif args.command == "tail":
+            source = tail_source(args.path, worker.stop_event, from_start=args.from_start)
+        else:
+            source = drop_dir_source(args.directory, worker.stop_event, once=args.once, on_file_error=worker.reject_file)
+        summary = worker.run(source)
+        print(f"{summary['scored']} transactions scorées, {summary['alerts']} alertes, {summary['rejected']} rejetées "
+              f"({summary['rejected_files']} fichiers), {summary['batches']} lots en {summary['seconds']:.2f} s",
+              file=sys.stderr)
+    finally:
+        for sink in (alert_sink, reject_sink):
+            if sink is not None:
+                sink.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""Générateur de transactions synthétiques fidèle au dataset de fraude.
+
+Un profil est appris sur fraude_bancaire_synthetique_final.csv, séparément
+pour les transactions frauduleuses et légitimes :
+- marginales des variables numériques (grille de quantiles, inversée par
+  interpolation : les valeurs plafonds comme salaire = 75 000 sont conservées),
+- leurs dépendances (copule gaussienne sur les rangs),
+- répartition des modalités (region, type_carte, genre, libellés bruts compris),
+- taux de valeurs manquantes par colonne, y compris pour l'étiquette fraude.
+
+La génération est vectorisée (NumPy) et écrite par morceaux en CSV ou Parquet :
+la mémoire reste bornée quel que soit le nombre de lignes. Même graine et même
+taille de morceau donnent le même fichier.
+
+    python synthetic.py generate --rows 10000000 --out .cache/transactions_10M.parquet --seed 0
+    python synthetic.py profile --out profil.json      # profil appris, pour inspection
+"""
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from data_loading import CATEGORY_COLUMNS, CHUNK_SIZE, DATA_PATH
+
+NUMERIC_FEATURES = ["age", "salaire", "score_credit", "montant_transaction", "anciennete_compte"]
+TARGET_COLUMN = "fraude"
+COLUMNS = NUMERIC_FEATURES + CATEGORY_COLUMNS + [TARGET_COLUMN]
+N_QUANTILES = 201
+PROFILE_VERSION = 1
+
+# --- Profil du Dataset ---
+def _normal_scores(values):
+    # Rangs -> scores normaux (base de la copule gaussienne)
+    from scipy.special import ndtri
+    ranks = pd.Series(values).rank(method="average").to_numpy()
+    return ndtri(ranks / (len(values) + 1))
+
+def _nearest_correlation(matrix):
+    # Matrice de corrélation valide (définie positive) même sur peu de lignes
+    eigenvalues, eigenvectors = np.linalg.eigh((matrix + matrix.T) / 2)
+    fixed = eigenvectors @ np.diag(np.clip(eigenvalues, 1e-6, None)) @ eigenvectors.T
+    scale = np.sqrt(np.diag(fixed))
+    return fixed / np.outer(scale, scale)
+
+def _class_profile(df):
+    probs = np.linspace(0, 1, N_QUANTILES)
+    numeric = {}
+    for col in NUMERIC_FEATURES:
+        values = df[col].dropna().to_numpy(np.float64)
+        numeric[col] = {
+            "quantiles": np.quantile(values, probs).tolist(),
+            "missing": float(df[col].isna().mean()),
+            "integer": bool(np.all(values == np.round(values))),
+        }
+    complete = df[NUMERIC_FEATURES].dropna()
+    scores = np.column_stack([_normal_scores(complete[col].to_numpy()) for col in NUMERIC_FEATURES])
+    correlation = _nearest_correlation(np.corrcoef(scores, rowvar=False))
+    categories = {}
+    for col in CATEGORY_COLUMNS:
+        counts = df[col].value_counts()
+        categories[col] = {
+            "values": [str(v) for v in counts.index],
+            "probabilities": (counts / counts.sum()).tolist(),
+            "missing": float(df[col].isna().mean()),
+        }
+    return {"rows": int(len(df)), "numeric": numeric, "correlation": correlation.tolist(), "categories": categories}
+
+def fit_profile(df):
+    labeled = df[df[TARGET_COLUMN].notna()]
+    return {
+        "version": PROFILE_VERSION,
+        "fraud_rate": float(labeled[TARGET_COLUMN].mean()),
+        "label_missing": float(df[TARGET_COLUMN].isna().mean()),
+        # Profils appris sur les lignes étiquetées ; à la génération, la classe est tirée selon fraud_rate
+        # puis l'étiquette est masquée avec la probabilité label_missing (le notebook complète ces lignes par KNN)
+        "classes": {str(label): _class_profile(labeled[labeled[TARGET_COLUMN] == label]) for label in (0, 1)},
+    }
+
+def load_profile(source=DATA_PATH):
+    # Profil JSON déjà appris, ou CSV d'origine
+    if str(source).lower().endswith(".json"):
+        with open(source, encoding="utf-8") as f:
+            profile = json.load(f)
+        if profile.get("version") != PROFILE_VERSION:
+            raise ValueError(f"Version de profil non supportée : {profile.get('version')}")
+        return profile
+    return fit_profile(pd.read_csv(source))
+
+# --- Génération Vectorisée ---
+def _sample_class(class_profile, n, rng):
+    probs = np.linspace(0, 1, N_QUANTILES)
+    out = {}
+    correlation = np.asarray(class_profile["correlation"])
+    from scipy.special import ndtr
+    uniforms = ndtr(rng.multivariate_normal(np.zeros(len(NUMERIC_FEATURES)), correlation, size=n, method="cholesky"))
+    for i, col in enumerate(NUMERIC_FEATURES):
+        spec = class_profile["numeric"][col]
+        values = np.interp(uniforms[:, i], probs, spec["quantiles"])
+        if spec["integer"]:
+            values = np.round(values)
+        values[rng.random(n) < spec["missing"]] = np.nan
+        out[col] = values
+    for col in CATEGORY_COLUMNS:
+        spec = class_profile["categories"][col]
+        values = np.asarray(spec["values"], dtype=object)[rng.choice(len(spec["values"]), size=n, p=spec["probabilities"])]
+        values[rng.random(n) < spec["missing"]] = None
+        out[col] = values
+    return out
+
+def generate_chunk(profile, n, rng):
+    fraud = rng.random(n) < profile["fraud_rate"]
+    chunk = {col: np.empty(n, dtype=object if col in CATEGORY_COLUMNS else np.float64) for col in COLUMNS}
+    for label, mask in (("0", ~fraud), ("1", fraud)):
+        count = int(mask.sum())
+        if count:
+            for col, values in _sample_class(profile["classes"][label], count, rng).items():
+                chunk[col][mask] = values
+    label = fraud.astype(np.float64)
+    label[rng.random(n) < profile["label_missing"]] = np.nan
+    chunk[TARGET_COLUMN] = label
+    return pd.DataFrame(chunk, columns=COLUMNS)
+
+def iter_synthetic_chunks(profile, rows, seed=0, chunk_size=CHUNK_SIZE):
+    rng = np.random.default_rng(seed)
+    for start in range(0, rows, chunk_size):
+        yield generate_chunk(profile, min(chunk_size, rows - start), rng)
+
+def _parquet_schema():
+    import pyarrow as pa
+    return pa.schema([(col, pa.string() if col in CATEGORY_COLUMNS else pa.float64()) for col in COLUMNS])
+
+def write_synthetic(path, rows, seed=0, source=DATA_PATH, chunk_size=CHUNK_SIZE):
+    # Format déduit de l'extension (.parquet, sinon CSV) ; un seul morceau en mémoire à la fois
+    profile = load_profile(source)
+    chunks = iter_synthetic_chunks(profile, rows, seed, chunk_size)
+    if str(path).lower().endswith(".parquet"):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        schema = _parquet_schema()
+        with pq.ParquetWriter(path, schema) as writer:
+            for chunk in chunks:
+                writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+    else:
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            for i, chunk in enumerate(chunks):
+                chunk.to_csv(f, index=False, header=(i == 0))
+    return path
+
+def main():
+    parser = argparse.ArgumentParser(description="Transactions synthétiques réalistes (profil du dataset de fraude)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    generate_parser = sub.add_parser("generate", help="Écrit N lignes en CSV ou Parquet")
+    generate_parser.add_argument("--rows", type=int, required=True)
+    generate_parser.add_argument("--out", required=True, help="Fichier .csv ou .parquet")
+    generate_parser.add_argument("--seed", type=int, default=0)
+    generate_parser.add_argument("--source", default=DATA_PATH, help="CSV d'origine ou profil JSON")
+    generate_parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    profile_parser = sub.add_parser("profile", help="Apprend et enregistre le profil")
+    profile_parser.add_argument("--source", default=DATA_PATH)
+    profile_parser.add_argument("--out", required=True)
+    args = parser.parse_args()
+
+    if args.command == "profile":
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(load_profile(args.source), f, indent=2, ensure_ascii=False)
+        print(f"Profil enregistré dans '{args.out}'")
+        return
+
+    os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+    start = time.perf_counter()
+    write_synthetic(args.out, args.rows, args.seed, args.source, args.chunk_size)
+    seconds = time.perf_counter() - start
+    print(f"{args.rows:,} lignes écrites dans '{args.out}' ({os.path.getsize(args.out) / 1e6:.1f} Mo) "
+          f"en {seconds:.1f} s ({args.rows / seconds:,.0f} lignes/s)".replace(",", " "))
+
+if __name__ == "__main__":
+    main()
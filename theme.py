@@ -0,0 +1,22 @@
+"""Thèmes clair / sombre de l'application.
+
+Les feuilles de style sont dans assets/ et lues une seule fois par processus ;
+chaque rerun ne fait plus que réinjecter la chaîne déjà construite.
+"""
+import os
+from functools import lru_cache
+
+import streamlit as st
+
+ASSETS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets")
+THEMES = ("light", "dark")
+
+@lru_cache(maxsize=len(THEMES))
+def load_theme_css(theme):
+    if theme not in THEMES:
+        theme = "light"
+    with open(os.path.join(ASSETS_DIR, f"theme_{theme}.css"), encoding="utf-8") as f:
+        return f"<style>\n{f.read()}</style>"
+
+def apply_theme_css(theme):
+    st.markdown(load_theme_css(theme), unsafe_allow_html=True)
@@ -0,0 +1,201 @@
+"""Entraînement reproductible du modèle (équivalent scriptable de Feze_sn_ML.ipynb).
+
+Étapes du notebook, dans le même ordre : imputation moyenne/mode et doublons,
+encodage label (genre, type_carte) et fréquence (region), complétion des
+étiquettes manquantes par KNN, SMOTE, écrêtage IQR, puis normalisation
+min-max et RandomForest (paramètres retenus par tune_model, ou recherche
+aléatoire avec --search). Les tableaux intermédiaires sont mis en cache dans
+.cache/train/ (clé = contenu du CSV + paramètres de l'étape) : une relance ne
+refait que ce qui a changé. Validation croisée et recherche utilisent n_jobs
+cœurs ; le temps de chaque étape est affiché à la fin.
+
+Écrit model.pkl, preprocessor.json, le bundle mmap et drift_baseline.json, tous
+cohérents entre eux.
+
+    python train.py
+    python train.py --search 30 --n-jobs -1
+    python train.py --model-out /tmp/model.pkl --preprocessor-out /tmp/preprocessor.json --bundle-out /tmp/bundle --baseline-out /tmp/drift_baseline.json
+"""
+import argparse
+import hashlib
+import json
+import os
+import pickle
+import time
+
+import numpy as np
+import pandas as pd
+
+from dashboard_aggregates import file_content_hash
+from data_loading import CACHE_DIR
+from perf import StageTimer, log_stage_timings
+from preprocessing import (KNN_NEIGHBORS, PREPROCESSOR_PATH, PREPROCESSOR_VERSION, SESSION_ID, SMOTE_SEED, TRAIN_SIZE,
+                           FraudPreprocessor, encode_and_fill, resample_and_split)
+
+DATA_PATH = "fraude_bancaire_synthetique_final.csv"
+MODEL_PATH = "model.pkl"
+TRAIN_CACHE_DIR = os.path.join(CACHE_DIR, "train")
+TRAIN_CACHE_VERSION = 2  # À incrémenter si le contenu d'une étape en cache change
+CV_FOLDS = 10
+# Paramètres du model.pkl issu de tune_model (Optuna n'a pas fait mieux que les valeurs par défaut)
+MODEL_PARAMS = {"n_estimators": 100, "criterion": "gini", "max_features": "sqrt", "max_depth": None,
+                "min_samples_split": 2, "min_samples_leaf": 1, "bootstrap": True, "class_weight": None}
+SEARCH_SPACE = {
+    "n_estimators": [50, 100, 200, 300],
+    "max_depth": [None, 8, 12, 16, 24],
+    "max_features": ["sqrt", "log2", None],
+    "min_samples_split": [2, 5, 10],
+    "min_samples_leaf": [1, 2, 4],
+    "bootstrap": [True, False],
+    "class_weight": [None, "balanced"],
+}
+
+# --- Cache des Tableaux Intermédiaires ---
+def _stage_key(*parts):
+    return hashlib.blake2b(json.dumps(parts, sort_keys=True, default=str).encode(), digest_size=12).hexdigest()
+
+def _cached(stage, key, compute, use_cache=True, cache_dir=TRAIN_CACHE_DIR):
+    # compute() -> (dict de tableaux numpy, métadonnées JSON) ; renvoie (tableaux, métadonnées, trouvé_en_cache)
+    path = os.path.join(cache_dir, f"{stage}_{key}.npz")
+    if use_cache and os.path.exists(path):
+        with np.load(path, allow_pickle=False) as data:
+            arrays = {name: data[name] for name in data.files if name != "_meta"}
+            return arrays, json.loads(str(data["_meta"])), True
+    arrays, meta = compute()
+    if use_cache:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = path + ".tmp.npz"
+        np.savez(tmp_path, _meta=np.array(json.dumps(meta)), **arrays)
+        os.replace(tmp_path, path)
+    return arrays, meta, False
+
+# --- Forêt ---
+def make_forest(params, n_jobs=None):
+    from sklearn.ensemble import RandomForestClassifier
+    return RandomForestClassifier(**params, n_jobs=n_jobs, random_state=SESSION_ID)
+
+def search_params(X, y, n_iter, n_jobs):
+    # Parallélisme sur les combinaisons × plis ; chaque forêt reste mono-cœur pour ne pas sursouscrire
+    from sklearn.model_selection import RandomizedSearchCV, StratifiedKFold
+
+    search = RandomizedSearchCV(make_forest(MODEL_PARAMS, n_jobs=1), SEARCH_SPACE, n_iter=n_iter, scoring="accuracy",
+                                cv=StratifiedKFold(CV_FOLDS, shuffle=True, random_state=SESSION_ID),
+                                n_jobs=n_jobs, random_state=SESSION_ID)
+    search.fit(X, y)
+    return {**MODEL_PARAMS, **search.best_params_}, float(search.best_score_)
+
+def cross_validate(params, X, y, n_jobs):
+    from sklearn.model_selection import StratifiedKFold, cross_val_score
+
+    scores = cross_val_score(make_forest(params, n_jobs=1), X, y, scoring="accuracy", n_jobs=n_jobs,
+                             cv=StratifiedKFold(CV_FOLDS, shuffle=True, random_state=SESSION_ID))
+    return float(scores.mean())
+
+def evaluate(model, X, y):
+    from sklearn.metrics import accuracy_score, f1_score, precision_score, recall_score, roc_auc_score
+
+    proba = model.predict_proba(X)[:, 1]
+    prediction = (proba > 0.5).astype(np.int64)
+    return {"accuracy": accuracy_score(y, prediction), "auc": roc_auc_score(y, proba),
+            "recall": recall_score(y, prediction), "precision": precision_score(y, prediction),
+            "f1": f1_score(y, prediction)}
+
+# --- Pipeline Complet ---
+def prepare(data_path=DATA_PATH, n_jobs=-1, use_cache=True, cache_dir=TRAIN_CACHE_DIR, timer=None):
+    # Étapes de prétraitement (en cache) : renvoie le découpage, le prétraitement appris et les métadonnées
+    timer = timer or StageTimer()
+    cache_hits = {}
+    data_key = file_content_hash(data_path)
+
+    encode_key = _stage_key("encode", TRAIN_CACHE_VERSION, data_key, PREPROCESSOR_VERSION, KNN_NEIGHBORS)
+    with timer.stage("encode_knn"):
+        def compute_encoded():
+            return encode_and_fill(pd.read_csv(data_path), n_jobs=n_jobs)
+        encoded, encode_meta, cache_hits["encode_knn"] = _cached("encoded", encode_key, compute_encoded, use_cache, cache_dir)
+
+    resample_key = _stage_key("resample", encode_key, SMOTE_SEED, SESSION_ID, TRAIN_SIZE)
+    with timer.stage("smote_clip_split"):
+        def compute_resampled():
+            preprocessor = FraudPreprocessor.from_dict(encode_meta["preprocessor"])
+            return resample_and_split(encoded["X"], encoded["y"], preprocessor)
+        split, split_meta, cache_hits["smote_clip_split"] = _cached("resampled", resample_key, compute_resampled,
+                                                                    use_cache, cache_dir)
+    meta = {"cache_hits": cache_hits, "knn_filled": encode_meta["knn_filled"], "resampled": split_meta["resampled"]}
+    return split, FraudPreprocessor.from_dict(split_meta["preprocessor"]), meta
+
+def train(data_path=DATA_PATH, search_iter=0, n_jobs=-1, use_cache=True, cache_dir=TRAIN_CACHE_DIR):
+    timer = StageTimer()
+    split, preprocessor, meta = prepare(data_path, n_jobs, use_cache, cache_dir, timer)
+
+    params, cv_accuracy = MODEL_PARAMS, None
+    if search_iter:
+        with timer.stage("search"):
+            params, cv_accuracy = search_params(split["X_train"], split["y_train"], search_iter, n_jobs)
+    else:
+        with timer.stage("cross_validation"):
+            cv_accuracy = cross_validate(params, split["X_train"], split["y_train"], n_jobs)
+
+    with timer.stage("fit"):
+        model = make_forest(params, n_jobs=n_jobs)
+        model.fit(pd.DataFrame(split["X_train"], columns=preprocessor.feature_order), split["y_train"])
+    with timer.stage("evaluate"):
+        metrics = evaluate(model, pd.DataFrame(split["X_test"], columns=preprocessor.feature_order), split["y_test"])
+
+    summary = {"params": params, "cv_accuracy": cv_accuracy, "test": metrics, **meta}
+    return model, preprocessor, timer, summary
+
+def save_outputs(model, preprocessor, data_path, model_path=MODEL_PATH, preprocessor_path=PREPROCESSOR_PATH,
+                 bundle_path=None, baseline_path=None, timer=None):
+    # Modèle, prétraitement, puis artefacts dérivés (bundle mmap, référence de dérive) régénérés ensemble
+    timer = timer or StageTimer()
+    with timer.stage("save"):
+        tmp_path = model_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(model, f)
+        os.replace(tmp_path, model_path)
+        preprocessor.save(preprocessor_path)
+        if bundle_path:
+            from forest_engine import FlatForest
+            from model_bundle import export_bundle
+            export_bundle(FlatForest.from_sklearn(model), bundle_path, model_path)
+        if baseline_path:
+            from drift_monitor import build_baseline, save_baseline
+            df = pd.read_csv(data_path)
+            X = pd.DataFrame(preprocessor.transform(df), columns=preprocessor.feature_order)
+            save_baseline(build_baseline(df, preprocessor, model.predict(X)), baseline_path)
+
+def main():
+    from drift_monitor import BASELINE_PATH
+    from model_bundle import BUNDLE_PATH
+
+    parser = argparse.ArgumentParser(description="Entraîne le RandomForest et régénère model.pkl et preprocessor.json")
+    parser.add_argument("--data", default=DATA_PATH)
+    parser.add_argument("--search", type=int, default=0, metavar="N",
+                        help="Recherche aléatoire de N combinaisons (validation croisée) au lieu des paramètres retenus")
+    parser.add_argument("--n-jobs", type=int, default=-1, help="Cœurs pour KNN, validation croisée, recherche et forêt")
+    parser.add_argument("--no-cache", action="store_true", help="Ignore et n'écrit pas le cache de .cache/train/")
+    parser.add_argument("--model-out", default=MODEL_PATH)
+    parser.add_argument("--preprocessor-out", default=PREPROCESSOR_PATH)
+    parser.add_argument("--bundle-out", default=BUNDLE_PATH, help="Chaîne vide pour ne pas exporter le bundle mmap")
+    parser.add_argument("--baseline-out", default=BASELINE_PATH, help="Chaîne vide pour ne pas régénérer la référence de dérive")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    model, preprocessor, timer, summary = train(args.data, args.search, args.n_jobs, use_cache=not args.no_cache)
+    save_outputs(model, preprocessor, args.data, args.model_out, args.preprocessor_out, args.bundle_out,
+                 args.baseline_out, timer)
+    log_stage_timings("train", timer, **summary)
+
+    print(f"Modèle enregistré dans '{args.model_out}', prétraitement dans '{args.preprocessor_out}'")
+    print(f"  {summary['knn_filled']} étiquette(s) complétée(s) par KNN, {summary['resampled']} lignes après SMOTE")
+    print(f"  Paramètres : {json.dumps(summary['params'])}")
+    print(f"  Validation croisée ({CV_FOLDS} plis) : accuracy {summary['cv_accuracy']:.4f}")
+    print("  Test : " + "  ".join(f"{name} {value:.4f}" for name, value in summary["test"].items()))
+    print("Temps par étape :")
+    for name, ms in timer.timings_ms.items():
+        cached = " (cache)" if summary["cache_hits"].get(name) else ""
+        print(f"  {name:<18} {ms / 1000:8.2f} s{cached}")
+    print(f"  {'total':<18} {time.perf_counter() - start:8.2f} s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+"""Pages de l'application Streamlit, importées à leur première ouverture (voir main.py)."""
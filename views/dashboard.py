@@ -0,0 +1,192 @@
+"""Page « Dashboard Analytique ».
+
+Plotly (via dashboard_charts) n'est importé qu'à la première ouverture de
+cette page.
+"""
+import time
+
+import streamlit as st
+
+from audit_store import AUDIT_DB_PATH, production_summary, recent_predictions
+from dashboard_aggregates import file_content_hash
+from dashboard_charts import (amount_histogram_figure, amount_box_figure, region_fraud_figure,
+                              card_fraud_rate_figure, age_violin_figure, salary_credit_scatter_figure,
+                              production_timeline_figure, production_region_figure, drift_distribution_figure)
+from data_loading import DATA_PATH, stream_dashboard_aggregates
+from drift_monitor import MIN_ROWS, PSI_MAJOR, PSI_MODERATE
+from explain import FEATURE_LABELS
+from views.monitoring import get_drift_monitor
+
+# --- Agrégats du Dashboard (lecture par morceaux, recalculés uniquement si le contenu du fichier change) ---
+@st.cache_data(show_spinner="Calcul des agrégats du dashboard...")
+def load_dashboard_aggregates(content_hash, file_path):
+    try:
+        return stream_dashboard_aggregates(file_path)
+    except Exception as e:
+        st.error(f"❌ Erreur lors du chargement du dataset : {e}")
+        st.stop()
+
+# --- Prédictions en Production (journal d'audit, requêtes indexées rafraîchies toutes les 15 s) ---
+PRODUCTION_PERIODS = {"Dernière heure": (1, 300), "24 heures": (24, 3600), "7 jours": (24 * 7, 6 * 3600), "30 jours": (24 * 30, 86400)}
+
+@st.cache_data(ttl=15, show_spinner=False)
+def load_production_summary(since_hours, bucket_seconds):
+    summary = production_summary(time.time() - since_hours * 3600, AUDIT_DB_PATH, bucket_seconds)
+    summary["recent_frauds"] = recent_predictions(AUDIT_DB_PATH, limit=20, frauds_only=True)
+    return summary
+
+def render_production_section():
+    st.subheader("📡 Prédictions en Production")
+    period = st.selectbox("Période", list(PRODUCTION_PERIODS), index=1, key="production_period")
+    summary = load_production_summary(*PRODUCTION_PERIODS[period])
+    if summary["total"] == 0:
+        st.info("Aucune prédiction journalisée sur cette période. Les analyses de la page « Prédiction de Fraude » apparaîtront ici.")
+        return
+    col_prod1, col_prod2, col_prod3 = st.columns(3)
+    with col_prod1:
+        st.metric(label="Prédictions", value=f"{summary['total']:,}".replace(",", " "))
+    with col_prod2:
+        st.metric(label="Fraudes Détectées", value=f"{summary['fraud']:,}".replace(",", " "),
+                  delta=f"{summary['fraud'] / summary['total'] * 100:.2f}% Taux de Fraude")
+    with col_prod3:
+        latency = summary["latency_ms"]
+        st.metric(label="Latence Moyenne / Transaction", value="-" if latency is None else f"{latency:.2f} ms")
+    st.plotly_chart(production_timeline_figure(summary), use_container_width=True)
+    if not summary["regions"].empty:
+        st.plotly_chart(production_region_figure(summary), use_container_width=True)
+    if not summary["recent_frauds"].empty:
+        st.markdown("<h4>Dernières Fraudes Détectées</h4>", unsafe_allow_html=True)
+        st.dataframe(summary["recent_frauds"], hide_index=True)
+
+# --- Dérive des Données (PSI / KS calculés à partir des seuls compteurs, sans relire l'historique) ---
+def _rate(value):
+    return "-" if value is None else f"{value * 100:.1f}%"
+
+def render_drift_section():
+    st.subheader("🧭 Dérive des Données en Production")
+    monitor = get_drift_monitor()
+    if monitor is None:
+        st.info("Aucune référence de dérive trouvée. Générez-la avec `python drift_monitor.py baseline`.")
+        return
+    report = monitor.report()
+    if report["rows"] == 0:
+        st.info("Aucune transaction scorée depuis la mise en place de la surveillance.")
+        return
+    if report["rows"] < MIN_ROWS:
+        st.warning(f"Seulement {report['rows']} transaction(s) surveillée(s) : les indicateurs de dérive sont peu fiables sous {MIN_ROWS}.")
+    col_drift1, col_drift2, col_drift3 = st.columns(3)
+    with col_drift1:
+        st.metric(label="Transactions Surveillées", value=f"{report['rows']:,}".replace(",", " "))
+    with col_drift2:
+        fraud_rate, baseline_rate = report["fraud_rate"], report["baseline_fraud_rate"]
+        delta = None if fraud_rate is None or baseline_rate is None else f"{(fraud_rate - baseline_rate) * 100:+.2f} pts vs entraînement"
+        st.metric(label="Taux de Fraude Prédit", value=_rate(fraud_rate), delta=delta, delta_color="inverse")
+    with col_drift3:
+        drifting = sum(1 for row in report["features"] if row["status"].endswith("forte"))
+        st.metric(label="Variables en Forte Dérive", value=f"{drifting} / {len(report['features'])}")
+    st.dataframe([{
+        "Variable": FEATURE_LABELS.get(row["feature"], row["feature"]),
+        "PSI": None if row["psi"] is None else round(row["psi"], 3),
+        "KS": None if row["ks"] is None else round(row["ks"], 3),
+        "Dérive": row["status"],
+        "Manquants": f"{_rate(row['missing_rate'])} (réf. {_rate(row['baseline_missing_rate'])})",
+        "Hors Bornes IQR": "-" if row["out_of_bounds_rate"] is None else
+            f"{_rate(row['out_of_bounds_rate'])} (réf. {_rate(row['baseline_out_of_bounds_rate'])})",
+        "Modalités Inconnues": _rate(row.get("unseen_rate")),
+    } for row in report["features"]], hide_index=True)
+    st.caption(f"PSI < {PSI_MODERATE} : stable ; {PSI_MODERATE} à {PSI_MAJOR} : dérive modérée ; > {PSI_MAJOR} : forte dérive. "
+               "KS calculé sur les histogrammes (cases = quantiles de l'entraînement).")
+    features = {FEATURE_LABELS.get(row["feature"], row["feature"]): row for row in report["features"]}
+    most_drifting = max(features, key=lambda label: features[label]["psi"] or 0)
+    selected = st.selectbox("Variable à comparer", list(features), index=list(features).index(most_drifting), key="drift_feature")
+    st.plotly_chart(drift_distribution_figure(features[selected]), use_container_width=True)
+
+def render():
+    st.markdown("<h2 style='color: #8dacec;'>Dashboard Analytique des Transactions 📊</h2>", unsafe_allow_html=True)
+    st.write("Explorez les tendances et les caractéristiques de vos données de transactions.")
+
+    data_path = DATA_PATH
+    try:
+        aggregates = load_dashboard_aggregates(file_content_hash(data_path), data_path)
+    except FileNotFoundError:
+        aggregates = None
+
+    if aggregates is not None:
+        st.success("✅ Dataset chargé avec succès ! Voici un aperçu :")
+        st.dataframe(aggregates["preview"])
+        st.markdown("---")
+
+        fraud_column = aggregates["fraud_column"]
+        columns = aggregates["columns"]
+
+        if fraud_column is None:
+            st.warning("⚠️ Impossible de détecter la colonne de fraude (ex: 'IsFraud'). Certains graphiques ne pourront pas être générés.")
+        else:
+            st.info(f"Colonne de fraude détectée : **'{fraud_column}'**")
+            st.markdown("---")
+
+            st.subheader("📈 Indicateurs Clés des Transactions")
+            total_transactions = aggregates["total"]
+            fraudulent_transactions = aggregates["fraud"]
+            non_fraudulent_transactions = aggregates["non_fraud"]
+            fraud_rate = (fraudulent_transactions / total_transactions) * 100 if total_transactions > 0 else 0
+
+            col_kpi1, col_kpi2, col_kpi3 = st.columns(3)
+            with col_kpi1:
+                st.metric(label="Total Transactions", value=f"{total_transactions:,}".replace(",", " "))
+            with col_kpi2:
+                st.metric(label="Transactions Frauduleuses", value=f"{fraudulent_transactions:,}".replace(",", " "), delta=f"{fraud_rate:.2f}% Taux de Fraude")
+            with col_kpi3:
+                st.metric(label="Transactions Non-Frauduleuses", value=f"{non_fraudulent_transactions:,}".replace(",", " "))
+            st.markdown("---")
+
+        st.subheader("📊 Visualisations Détaillées")
+
+        if "montant_transaction" in aggregates["histograms"]:
+            st.markdown("<h4>Distribution des Montants de Transaction</h4>", unsafe_allow_html=True)
+            st.plotly_chart(amount_histogram_figure(aggregates), use_container_width=True)
+        else:
+            st.warning("La colonne 'montant_transaction' est introuvable pour ce graphique.")
+
+        if fraud_column and aggregates["box"]:
+            st.markdown("<h4>Montant de Transaction par Catégorie de Fraude</h4>", unsafe_allow_html=True)
+            st.plotly_chart(amount_box_figure(aggregates), use_container_width=True)
+
+        if fraud_column and "region" in columns:
+            st.markdown("<h4>Répartition des Fraudes par Région</h4>", unsafe_allow_html=True)
+            st.plotly_chart(region_fraud_figure(aggregates), use_container_width=True)
+
+        if fraud_column and "type_carte" in columns:
+            st.markdown("<h4>Taux de Fraude par Type de Carte</h4>", unsafe_allow_html=True)
+            if aggregates["card_rates"] is not None:
+                st.plotly_chart(card_fraud_rate_figure(aggregates), use_container_width=True)
+            else:
+                st.info("Pas de transactions frauduleuses enregistrées pour le type de carte dans le dataset actuel.")
+
+        if fraud_column and "age" in columns:
+            st.markdown("<h4>Distribution de l'Âge et Statut de Fraude</h4>", unsafe_allow_html=True)
+            st.plotly_chart(age_violin_figure(aggregates), use_container_width=True)
+
+        if fraud_column and "salaire" in columns and "score_credit" in columns:
+            st.markdown("<h4>Salaire vs Score de Crédit par Statut de Fraude</h4>", unsafe_allow_html=True)
+            st.plotly_chart(salary_credit_scatter_figure(aggregates), use_container_width=True)
+        else:
+            if fraud_column:
+                missing_cols = []
+                if "salaire" not in columns: missing_cols.append("'salaire'")
+                if "score_credit" not in columns: missing_cols.append("'score_credit'")
+                if missing_cols:
+                    st.warning(f"Les colonnes {', '.join(missing_cols)} sont introuvables pour le graphique 'Salaire vs Score de Crédit'.")
+        if aggregates["sample"] is not None and len(aggregates["sample"]) < aggregates["total"]:
+            st.caption(f"Violon et nuage de points : échantillon stratifié de {len(aggregates['sample']):,} transactions.".replace(",", " "))
+        st.markdown("---")
+        render_production_section()
+        st.markdown("---")
+        render_drift_section()
+    else:
+        st.warning("Veuillez fournir un fichier CSV pour le Dashboard. Nom de fichier attendu: `fraude_bancaire_synthetique_final.csv`.")
+        st.info("Vous pouvez placer votre fichier CSV dans le même répertoire que cette application.")
+        st.markdown("---")
+        render_production_section()
+        st.markdown("---")
+        render_drift_section()
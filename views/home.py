@@ -0,0 +1,36 @@
+"""Page « Accueil » : contenu statique, sans dépendance lourde."""
+import streamlit as st
+
+def render():
+    st.markdown("<h2 style='color: #8dacec;'>Bienvenue dans votre solution de sécurité financière avancée.</h2>", unsafe_allow_html=True)
+    st.write(
+        """
+        Découvrez la puissance de l'intelligence artificielle pour protéger vos transactions.
+        Notre système intelligent analyse les données en temps réel pour identifier et prévenir les activités frauduleuses avec une précision inégalée.
+        """
+    )
+    st.markdown("---")
+    col_intro1, col_intro2 = st.columns(2)
+    with col_intro1:
+        st.subheader("🚀 Détection Rapide et Précise")
+        st.write(
+            """
+            Utilisant un modèle de Machine Learning entraîné sur des milliers de transactions, notre application
+            vous fournit des prédictions instantanées sur la probabilité de fraude.
+            Chaque résultat est accompagné d'un pourcentage de confiance pour une décision éclairée.
+            """
+        )
+        st.subheader("📊 Visualisation Intuitive")
+        st.write(
+            """
+            Explorez les tendances et les modèles de fraude grâce à notre tableau de bord interactif.
+            Obtenez des insights précieux sur votre dataset pour renforcer vos stratégies de sécurité.
+            """
+        )
+    with col_intro2:
+        st.image("https://images.pexels.com/photos/730547/pexels-photo-730547.jpeg?auto=compress&cs=tinysrgb&w=1260&h=750&dpr=1",
+                 caption="Protégez vos actifs avec l'IA", use_container_width=True)
+    st.markdown("---")
+    st.write("Pour commencer, naviguez vers l'option **'Prédiction de Fraude'** ou explorez vos données dans le **'Dashboard Analytique'**.")
+
+
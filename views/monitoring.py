@@ -0,0 +1,21 @@
+"""Ressources de surveillance partagées entre les pages (sans plotly ni modèle).
+
+La page « Prédiction de Fraude » alimente le moniteur de dérive, le
+« Dashboard Analytique » l'affiche : les deux obtiennent la même instance.
+"""
+import logging
+
+import streamlit as st
+
+from drift_monitor import BASELINE_PATH, STATE_PATH, DriftMonitor, load_baseline
+
+logger = logging.getLogger("fraude.app")
+
+# --- Dérive des Données (compteurs en mémoire constante, état sauvegardé dans .cache/) ---
+@st.cache_resource
+def get_drift_monitor():
+    try:
+        return DriftMonitor(load_baseline(BASELINE_PATH), state_path=STATE_PATH)
+    except FileNotFoundError:
+        logger.warning("Référence de dérive '%s' introuvable : surveillance désactivée", BASELINE_PATH)
+        return None
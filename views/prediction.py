@@ -0,0 +1,373 @@
+"""Page « Prédiction de Fraude » : formulaire unitaire et analyse par lot.
+
+Le modèle, le prétraitement et ReportLab (via reports) ne sont chargés qu'à la
+première ouverture de cette page, puis partagés par st.cache_resource.
+"""
+import logging
+import time
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from audit_store import AuditStore
+from dispatcher import MicroBatchDispatcher
+from explain import FEATURE_LABELS, explanation_rows, format_factors
+from perf import StageTimer, log_stage_timings
+from prediction_cache import PredictionCache
+from reports import BULK_REPORT_MAX_ROWS, FACTORS_KEY, GENRE_LABELS, ReportService, report_key, stream_content_hash
+from scoring import (MODEL_PATH, PREPROCESSOR_PATH, count_file_rows, encode_transactions, iter_file_chunks,
+                     load_model, load_preprocessor, model_version, score_frame)
+from views.monitoring import get_drift_monitor
+
+logger = logging.getLogger("fraude.app")
+
+# --- Fonction de Chargement du Modèle (mise à jour pour st.cache_resource) ---
+# La version (empreinte de model.pkl) fait partie de la clé : un nouveau fichier est rechargé automatiquement
+@st.cache_resource(max_entries=1) # Utilisez st.cache_resource pour les modèles
+def load_fraud_model(model_version_id):
+    try:
+        return load_model(MODEL_PATH)
+    except FileNotFoundError:
+        st.error("❌ Erreur : Le fichier 'model.pkl' est introuvable. Veuillez vous assurer qu'il est dans le répertoire correct.")
+        st.stop()
+    except Exception as e:
+        st.error(f"❌ Erreur lors du chargement du modèle : {e}")
+        st.stop()
+
+# --- Cache des Prédictions (partagé entre toutes les sessions) ---
+@st.cache_resource
+def get_prediction_cache():
+    return PredictionCache()
+
+# --- Micro-batching : les prédictions de toutes les sessions regroupées en un seul appel au modèle ---
+@st.cache_resource
+def get_prediction_dispatcher():
+    # Fenêtre et taille de lot : variables FRAUDE_BATCH_WINDOW_MS et FRAUDE_BATCH_MAX_SIZE
+    return MicroBatchDispatcher()
+
+# --- Prétraitement appris (mêmes encodages qu'à l'entraînement) ---
+@st.cache_resource
+def load_fraud_preprocessor():
+    try:
+        return load_preprocessor(PREPROCESSOR_PATH)
+    except FileNotFoundError:
+        st.error(f"❌ Erreur : Le fichier '{PREPROCESSOR_PATH}' est introuvable. Générez-le avec `python preprocessing.py fit`.")
+        st.stop()
+    except Exception as e:
+        st.error(f"❌ Erreur lors du chargement du prétraitement : {e}")
+        st.stop()
+
+# --- Journal d'audit (SQLite WAL, écrit en arrière-plan, partagé entre sessions) ---
+@st.cache_resource
+def get_audit_store():
+    return AuditStore()
+
+# --- Rapports PDF (générés à la demande, en arrière-plan, mémorisés par prédiction) ---
+@st.cache_resource
+def get_report_service():
+    return ReportService()
+
+@st.fragment
+def pdf_report_section(key, prediction_data):
+    # Fragment : le clic ne relance que cette section, le résultat de l'analyse reste affiché
+    report_service = get_report_service()
+    future = report_service.get(key)
+    if future is None and st.button("📄 Préparer le Rapport PDF", key=f"pdf_prepare_{key[:16]}"):
+        future = report_service.report(key, prediction_data)
+    if future is not None:
+        try:
+            with st.spinner("Génération du rapport PDF..."):
+                pdf_bytes = future.result()
+        except Exception as e:
+            logger.exception("Échec de la génération du rapport PDF")
+            st.error(f"❌ Échec de la génération du rapport PDF : {e}. Vous pouvez relancer la génération.")
+            return
+        st.download_button(
+            label="💾 Télécharger le Rapport Complet (PDF)",
+            data=pdf_bytes,
+            file_name=f"rapport_prediction_fraude_{time.strftime('%Y%m%d_%H%M%S')}.pdf",
+            mime="application/pdf",
+            on_click="ignore",
+            key=f"pdf_download_{key[:16]}",
+        )
+
+@st.fragment
+def bulk_report_section(key, fraud_df, model):
+    output_format = st.radio("Format des rapports", ["PDF multi-pages", "ZIP (un PDF par transaction)"],
+                             horizontal=True, key=f"bulk_format_{key[:16]}")
+    output_format = "zip" if output_format.startswith("ZIP") else "pdf"
+    format_key = f"{key}:{output_format}"
+    report_service = get_report_service()
+    future = report_service.get(format_key)
+    if future is None and st.button(f"📄 Générer les Rapports des {len(fraud_df)} Fraudes", key=f"bulk_prepare_{key[:16]}"):
+        future = report_service.bulk_from_frame(format_key, fraud_df, output_format, model)
+    if future is not None:
+        try:
+            with st.spinner("Génération des rapports PDF..."):
+                report_bytes = future.result()
+        except Exception as e:
+            logger.exception("Échec de la génération des rapports PDF")
+            st.error(f"❌ Échec de la génération des rapports PDF : {e}. Vous pouvez relancer la génération.")
+            return
+        st.download_button(
+            label="💾 Télécharger les Rapports",
+            data=report_bytes,
+            file_name=f"rapports_lot_fraude_{time.strftime('%Y%m%d_%H%M%S')}.{output_format}",
+            mime="application/zip" if output_format == "zip" else "application/pdf",
+            on_click="ignore",
+            key=f"bulk_download_{format_key[:16]}_{output_format}",
+        )
+
+def render():
+    try:
+        model_version_id = model_version(MODEL_PATH)
+    except FileNotFoundError:
+        model_version_id = None # load_fraud_model affiche l'erreur
+    model = load_fraud_model(model_version_id)
+    prediction_cache = get_prediction_cache()
+    prediction_cache.bind_model_version(model_version_id)
+    prediction_dispatcher = get_prediction_dispatcher()
+    prediction_dispatcher.bind_model(model)
+    preprocessor = load_fraud_preprocessor()
+    audit_store = get_audit_store()
+    drift_monitor = get_drift_monitor()
+
+    st.markdown("<h2 style='color: #8dacec;'>Effectuer une Nouvelle Prédiction</h2>", unsafe_allow_html=True)
+    st.markdown("Renseignez les informations de la transaction ci-dessous pour obtenir une analyse instantanée.")
+
+    # Formulaire de Saisie des Données
+    with st.form("prediction_form", clear_on_submit=False):
+        st.markdown("### Informations du Client et de la Transaction")
+        col_pred1, col_pred2 = st.columns(2)
+        with col_pred1:
+            age = st.number_input("Âge du Client", min_value=0, max_value=120, step=1, value=30, key="age_input")
+            genre = st.selectbox("Genre du Client", list(reversed(preprocessor.label_classes["genre"])), index=0,
+                                 format_func=lambda g: GENRE_LABELS.get(g, g), key="genre_input")
+            region = st.selectbox("Région de la Transaction", list(preprocessor.frequencies["region"]), index=0, key="region_input")
+            salaire = st.number_input("Salaire Annuel (€)", min_value=0.0, step=500.0, value=50000.0, key="salaire_input")
+        with col_pred2:
+            type_carte = st.selectbox("Type de Carte Utilisée", preprocessor.label_classes["type_carte"], index=0, key="type_carte_input")
+            score_credit = st.number_input("Score de Crédit (0-100)", min_value=0.0, max_value=100.0, step=1.0, value=75.0, key="score_credit_input")
+            montant_transaction = st.number_input("Montant de la Transaction (€)", min_value=0.0, step=50.0, value=100.0, key="montant_transaction_input")
+            anciennete_compte = st.number_input("Ancienneté du Compte (années)", min_value=0.0, step=0.5, value=5.0, key="anciennete_compte_input")
+
+        st.markdown("---")
+        submit_button = st.form_submit_button("🚀 Lancer la Prédiction")
+
+    if submit_button:
+        # Garde l'état de la page pour rester sur la prédiction
+        st.session_state.current_page = "Prédiction de Fraude"
+
+        timer = StageTimer()
+        with st.spinner("Analyse intelligente en cours... Veuillez patienter."):
+            # Même encodage que l'API et l'analyse par lot (scoring.encode_transactions)
+            with timer.stage("encode"):
+                transaction = {
+                    "age": age, "genre": genre, "salaire": salaire, "region": region,
+                    "type_carte": type_carte, "score_credit": score_credit,
+                    "montant_transaction": montant_transaction, "anciennete_compte": anciennete_compte
+                }
+                input_vector = encode_transactions(pd.DataFrame([transaction]), preprocessor)
+
+            with timer.stage("predict_proba"):
+                if hasattr(model, 'predict_proba'):
+                    cache_key = PredictionCache.make_key(model_version_id, input_vector)
+                    prediction_proba = prediction_cache.get(cache_key)
+                    cache_hit = prediction_proba is not None
+                    if not cache_hit:
+                        prediction_proba = prediction_dispatcher.predict_proba(input_vector)
+                        prediction_cache.put(cache_key, prediction_proba)
+                    prediction_class = np.argmax(prediction_proba)
+                    confidence_percentage = prediction_proba.max() * 100
+                    proba_fraude = float(prediction_proba[1])
+                else:
+                    cache_hit = False
+                    prediction_class = model.predict(input_vector)[0]
+                    confidence_percentage = 100.0
+                    proba_fraude = float(prediction_class)
+                    st.warning("⚠️ Votre modèle ne supporte pas `predict_proba`. Le pourcentage de confiance est affiché à 100% par défaut.")
+
+            with timer.stage("explain"):
+                # Contributions par variable (décomposition par chemins sur toute la forêt, < 1 ms)
+                try:
+                    explanation = explanation_rows(model, input_vector)[0]
+                except Exception as e:
+                    logger.warning("Explication indisponible pour ce modèle : %s", e)
+                    explanation = None
+
+        with timer.stage("render"):
+            st.markdown("---")
+            st.subheader("✨ Résultat de l'Analyse")
+            if prediction_class == 1:
+                st.error(f"🚨 **ALERTE FRAUDE POTENTIELLE !**")
+                st.markdown(f"<h3 style='color: #F44336;'>Confiance du Modèle : <span style='font-size: 1.2em;'>{confidence_percentage:.2f}%</span></h3>", unsafe_allow_html=True)
+                st.write("Nous avons détecté une forte probabilité que cette transaction soit frauduleuse. Une investigation plus approfondie est recommandée.")
+            else:
+                st.success(f"✅ **TRANSACTION SÉCURISEÉE**")
+                st.markdown(f"<h3 style='color: #4CAF50;'>Confiance du Modèle : <span style='font-size: 1.2em;'>{confidence_percentage:.2f}%</span></h3>", unsafe_allow_html=True)
+                st.write("Cette transaction semble légitime selon notre analyse. Confiance élevée.")
+
+            st.markdown("---")
+            st.subheader("📊 Détails des Entrées Fournies")
+            prediction_data_display = {
+                "Âge": age,
+                "Genre": GENRE_LABELS.get(genre, genre),
+                "Région": region,
+                "Salaire": f"{salaire:,.2f} €".replace(",", " "),
+                "Type de Carte": type_carte,
+                "Score de Crédit": f"{score_credit:.1f}",
+                "Montant Transaction": f"{montant_transaction:,.2f} €".replace(",", " "),
+                "Ancienneté du Compte": f"{anciennete_compte:.1f} années",
+                "Prédiction": "Fraude" if prediction_class == 1 else "Non Fraude",
+                "Confiance": f"{confidence_percentage:.2f}%"
+            }
+
+            col_data1, col_data2 = st.columns(2)
+            data_keys = list(prediction_data_display.keys())
+            for i, key in enumerate(data_keys[:len(data_keys)//2]):
+                with col_data1:
+                    st.markdown(f"**{key}:** {prediction_data_display[key]}")
+            for i, key in enumerate(data_keys[len(data_keys)//2:]):
+                with col_data2:
+                    st.markdown(f"**{key}:** {prediction_data_display[key]}")
+
+            report_data = prediction_data_display
+            if explanation is not None:
+                st.markdown("---")
+                st.subheader("🔍 Facteurs de la Décision")
+                raw_values = {name: prediction_data_display.get(label, "") for name, label in FEATURE_LABELS.items()}
+                factors = format_factors(explanation["facteurs"], raw_values)
+                for (label, value, points), (_, contribution) in zip(factors, explanation["facteurs"]):
+                    arrow = "🔺" if contribution > 0 else "🔻"
+                    st.markdown(f"{arrow} **{label}** ({value}) : {points}")
+                st.caption(f"Contribution de chaque variable à la probabilité de fraude (en points de %), "
+                           f"à partir d'une base de {explanation['biais'] * 100:.1f}% ; 🔺 vers la fraude, 🔻 vers une transaction légitime.")
+                report_data = {**prediction_data_display, FACTORS_KEY: factors}
+
+            st.markdown("---")
+            st.subheader("📄 Générer un Rapport PDF")
+        pdf_report_section(report_key(model_version_id, report_data), report_data)
+        st.info("Ce rapport PDF inclut toutes les informations saisies, le résultat de la prédiction et ses principaux facteurs.")
+
+        # Journal d'audit : simple dépôt dans une file, l'écriture SQLite se fait en arrière-plan
+        audit_store.record_prediction(transaction, input_vector, proba_fraude, int(prediction_class), model_version_id,
+                                      latency_ms=timer.total_ms, cache_hit=cache_hit)
+        if drift_monitor is not None:
+            drift_monitor.update(pd.DataFrame([transaction]), [int(prediction_class)])
+        log_stage_timings("prediction", timer, prediction=int(prediction_class),
+                          confidence=round(float(confidence_percentage), 2), cache_hit=cache_hit,
+                          model_version=model_version_id)
+        with st.expander("⏱️ Performance de l'Analyse", expanded=False):
+            for stage_name, stage_ms in timer.timings_ms.items():
+                st.markdown(f"**{stage_name}** : {stage_ms:.2f} ms")
+            st.markdown(f"**Total** : {timer.total_ms:.2f} ms")
+            st.markdown(f"**Cache** : {'hit' if cache_hit else 'miss'}")
+
+    with st.expander("🗄️ Cache de Prédictions", expanded=False):
+        cache_stats = prediction_cache.stats()
+        col_cache1, col_cache2, col_cache3, col_cache4 = st.columns(4)
+        with col_cache1:
+            st.metric(label="Hits", value=cache_stats["hits"], delta=f"{cache_stats['hit_rate'] * 100:.1f}%")
+        with col_cache2:
+            st.metric(label="Misses", value=cache_stats["misses"])
+        with col_cache3:
+            st.metric(label="Évictions", value=cache_stats["evictions"] + cache_stats["expirations"])
+        with col_cache4:
+            st.metric(label="Entrées", value=f"{cache_stats['size']} / {cache_stats['maxsize']}")
+        st.caption(f"Version du modèle : `{model_version_id}` — invalidations : {cache_stats['invalidations']}")
+
+    with st.expander("🧮 Micro-batching des Prédictions", expanded=False):
+        dispatch_stats = prediction_dispatcher.stats()
+        col_batch1, col_batch2, col_batch3, col_batch4 = st.columns(4)
+        with col_batch1:
+            st.metric(label="File d'attente", value=dispatch_stats["queue_depth"], delta=f"max {dispatch_stats['max_queue_depth']}", delta_color="off")
+        with col_batch2:
+            st.metric(label="Taille de lot moyenne", value=f"{dispatch_stats['mean_batch_size']:.1f}")
+        with col_batch3:
+            wait_p50 = dispatch_stats["wait_p50_ms"]
+            st.metric(label="Attente ajoutée (p50)", value="-" if wait_p50 is None else f"{wait_p50:.2f} ms")
+        with col_batch4:
+            wait_p99 = dispatch_stats["wait_p99_ms"]
+            st.metric(label="Attente ajoutée (p99)", value="-" if wait_p99 is None else f"{wait_p99:.2f} ms")
+        if dispatch_stats["batch_sizes"]:
+            st.bar_chart(pd.Series(dispatch_stats["batch_sizes"], name="Lots").rename_axis("Taille du lot"))
+        st.caption(f"Fenêtre : {dispatch_stats['window_ms']:g} ms — lot max : {dispatch_stats['max_batch']} — "
+                   f"{dispatch_stats['requests']} requêtes en {dispatch_stats['batches']} lots")
+
+    # --- Analyse par Lot ---
+    st.markdown("---")
+    st.markdown("### 📂 Analyse par Lot (CSV / Parquet)")
+    st.markdown("Importez un fichier au format de `fraude_bancaire_synthetique_final.csv` pour scorer toutes ses transactions d'un coup.")
+    uploaded_file = st.file_uploader("Fichier de transactions", type=["csv", "parquet"], key="batch_file_input")
+
+    if uploaded_file is not None and st.button("📊 Lancer l'Analyse du Lot", key="batch_submit_button"):
+        st.session_state.current_page = "Prédiction de Fraude"
+        st.session_state.pop("batch_result", None)
+        total_rows = count_file_rows(uploaded_file)
+        progress_bar = st.progress(0.0, text="Analyse du lot en cours...")
+        output_buffer = BytesIO()
+        scored_rows = 0
+        fraud_rows = 0
+        fraud_chunks = [] # Lignes frauduleuses conservées (bornées) pour les rapports PDF en lot
+        try:
+            for chunk in iter_file_chunks(uploaded_file):
+                chunk_start = time.perf_counter()
+                scored_chunk, encoded_chunk = score_frame(chunk, model, return_encoded=True)
+                audit_store.record_frame(scored_chunk, encoded_chunk, model_version_id,
+                                         latency_ms=(time.perf_counter() - chunk_start) * 1000,
+                                         source=f"lot:{uploaded_file.name}")
+                if drift_monitor is not None:
+                    drift_monitor.update(chunk, scored_chunk["prediction"] == "Fraude")
+                scored_chunk.to_csv(output_buffer, index=False, header=(scored_rows == 0))
+                scored_rows += len(scored_chunk)
+                fraud_chunk = scored_chunk[scored_chunk["prediction"] == "Fraude"]
+                if fraud_rows < BULK_REPORT_MAX_ROWS:
+                    fraud_chunks.append(fraud_chunk.head(BULK_REPORT_MAX_ROWS - fraud_rows))
+                fraud_rows += len(fraud_chunk)
+                progress_bar.progress(min(scored_rows / total_rows, 1.0) if total_rows else 1.0,
+                                      text=f"{scored_rows:,} / {total_rows:,} transactions analysées".replace(",", " "))
+        except ValueError as e:
+            progress_bar.empty()
+            st.error(f"❌ {e}")
+        else:
+            progress_bar.progress(1.0, text="Analyse du lot terminée.")
+            # Résultats conservés dans la session : ils restent affichés aux réexécutions suivantes
+            st.session_state["batch_result"] = {
+                "file_id": uploaded_file.file_id,
+                # Clé des rapports (partagés entre sessions) : contenu du fichier, pas son nom
+                "content_hash": stream_content_hash(uploaded_file),
+                "model_version": model_version_id,
+                "scored_rows": scored_rows,
+                "fraud_rows": fraud_rows,
+                "csv": output_buffer.getvalue(),
+                "file_name": f"resultats_lot_fraude_{time.strftime('%Y%m%d_%H%M%S')}.csv",
+                "frauds": pd.concat(fraud_chunks, ignore_index=True) if fraud_chunks else None,
+            }
+
+    batch_result = st.session_state.get("batch_result")
+    if batch_result is not None and (uploaded_file is None or batch_result["file_id"] != uploaded_file.file_id
+                                     or batch_result["model_version"] != model_version_id):
+        st.session_state.pop("batch_result", None) # Fichier retiré ou remplacé, ou nouveau modèle
+        batch_result = None
+    if batch_result is not None:
+        col_batch1, col_batch2 = st.columns(2)
+        with col_batch1:
+            st.metric(label="Transactions Analysées", value=f"{batch_result['scored_rows']:,}".replace(",", " "))
+        with col_batch2:
+            st.metric(label="Fraudes Potentielles", value=f"{batch_result['fraud_rows']:,}".replace(",", " "))
+        st.download_button(
+            label="💾 Télécharger les Résultats (CSV)",
+            data=batch_result["csv"],
+            file_name=batch_result["file_name"],
+            mime="text/csv",
+            on_click="ignore",
+            key="batch_download_button",
+        )
+        if batch_result["fraud_rows"]:
+            st.markdown("#### 📄 Rapports PDF des Transactions Frauduleuses")
+            if batch_result["fraud_rows"] > BULK_REPORT_MAX_ROWS:
+                st.caption(f"Limité aux {BULK_REPORT_MAX_ROWS:,} premières fraudes du fichier.".replace(",", " "))
+            bulk_report_section(report_key("lot", batch_result["content_hash"], batch_result["model_version"]),
+                                batch_result["frauds"], model)